@@ -31,6 +31,8 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from src.cart_manager import CartManager
 from src.visualizer import Visualizer
+from src.event_sink import get_sink
+from src.video_writer import AsyncVideoWriter
 
 
 def create_synthetic_frame(width, height, frame_num, detections):
@@ -111,8 +113,7 @@ def create_demo_video(output_path="fastbillingx_demo.mp4", duration_seconds=132)
     visualizer = Visualizer()
     
     # Video writer
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    out = AsyncVideoWriter(output_path, 'mp4v', fps, (width, height))
     
     if not out.isOpened():
         print("[!] Error: Could not create video writer")
@@ -254,7 +255,12 @@ def create_demo_video(output_path="fastbillingx_demo.mp4", duration_seconds=132)
         
         # Draw cart overlay
         fps_display = fps  # Display actual FPS
-        frame = visualizer.draw_cart_overlay(frame, cart_items, fps_display)
+        frame = visualizer.draw_cart_overlay(
+            frame, cart_items, fps_display,
+            total=cart_manager.get_total(),
+            item_count=cart_manager.get_item_count(),
+            cart_version=cart_manager.version
+        )
         
         # Write frame
         out.write(frame)
@@ -273,6 +279,7 @@ def create_demo_video(output_path="fastbillingx_demo.mp4", duration_seconds=132)
     
     # Release video writer
     out.release()
+    get_sink().flush()
     
     # Final summary
     print(f"\n[✓] Video creation completed!")
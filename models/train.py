@@ -143,7 +143,9 @@ def train_model(args):
         for fmt, description in export_formats.items():
             try:
                 print(f"   - Exporting to {description}...", end=" ")
-                model.export(format=fmt, imgsz=args.imgsz)
+                # Dynamic axes let the ONNX Runtime backend batch frames
+                export_kwargs = {'dynamic': True} if fmt == 'onnx' else {}
+                model.export(format=fmt, imgsz=args.imgsz, **export_kwargs)
                 print("✓")
             except Exception as e:
                 print(f"✗ ({str(e)[:30]})")
@@ -15,6 +15,7 @@ Usage:
     python run_demo.py --model custom.pt        # Use custom model
     python run_demo.py --output result.mp4      # Save output video
     python run_demo.py --source 0 --conf 0.45   # Adjust confidence threshold
+    python run_demo.py --dry-run                # Validate setup without loading the model
 """
 
 import sys
@@ -26,31 +27,39 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 import argparse
 from pathlib import Path
 
+from src.startup import BACKEND_REQUIREMENTS, StartupProfiler, is_installed
+
 
 def print_banner():
     """Print welcome banner"""
     banner = """
-    
+    ============================================================
+         FastBillingX - AI Computer Vision Checkout System
+         Real-time product detection & smart cart billing
+    ============================================================
+    """
     print(banner)
 
 
-def check_dependencies():
-    """Check if required packages are installed"""
+def check_dependencies(backend='ultralytics'):
+    """
+    Check if required packages are installed
+    
+    Uses module discovery only, so nothing (in particular torch) is
+    imported just to prove it exists.
+    """
     print("\n[*] Checking dependencies...")
     
     required_packages = [
         ('cv2', 'opencv-python'),
-        ('ultralytics', 'ultralytics'),
-        ('numpy', 'numpy'),
-        ('torch', 'torch')
-    ]
+        ('numpy', 'numpy')
+    ] + BACKEND_REQUIREMENTS[backend]
     
     missing = []
     for module_name, package_name in required_packages:
-        try:
-            __import__(module_name)
+        if is_installed(module_name):
             print(f"    ✓ {package_name}")
-        except ImportError:
+        else:
             print(f"    ✗ {package_name} (MISSING)")
             missing.append(package_name)
     
@@ -63,6 +72,48 @@ def check_dependencies():
     return True
 
 
+def validate_config(args):
+    """
+    Validate CLI configuration without loading the model
+    
+    Returns:
+        List of error messages (empty if the configuration is usable)
+    """
+    errors = []
+    if args.source != '0' and not args.source.isdigit() and '://' not in args.source \
+            and not os.path.exists(args.source):
+        errors.append(f"Video source not found: {args.source}")
+    if not 0 < args.conf <= 1:
+        errors.append(f"Confidence threshold must be in (0, 1]: {args.conf}")
+    if args.render_fps is not None and args.render_fps <= 0:
+        errors.append(f"Render rate must be > 0: {args.render_fps}")
+    if args.batch_size < 1:
+        errors.append(f"Batch size must be >= 1: {args.batch_size}")
+    if not 0 <= args.tile_overlap < 1:
+        errors.append(f"Tile overlap must be in [0, 1): {args.tile_overlap}")
+    try:
+        sizes = [int(size) for size in args.imgsz_options.split(',')]
+        if not sizes or min(sizes) <= 0:
+            raise ValueError
+    except ValueError:
+        errors.append(f"Input sizes must be positive integers, e.g. 320,416,512,640: {args.imgsz_options}")
+    try:
+        low, high = (float(value) for value in args.cascade_band.split(','))
+        if not 0 <= low < high <= 1:
+            raise ValueError
+    except ValueError:
+        errors.append(f"Cascade band must be \"low,high\" with 0 <= low < high <= 1: {args.cascade_band}")
+    if args.allowed_classes and not os.path.exists(args.allowed_classes):
+        errors.append(f"Class filter file not found: {args.allowed_classes}")
+    if args.roi_config:
+        try:
+            from src.roi import load_scan_zones
+            load_scan_zones(args.roi_config, args.camera)
+        except (OSError, ValueError, KeyError) as e:
+            errors.append(f"Invalid scan zone config: {e}")
+    return errors
+
+
 def check_model(model_path):
     """Check if model file exists"""
     if os.path.exists(model_path):
@@ -102,6 +153,15 @@ EXAMPLES:
   # Lower confidence threshold for more detections
   python run_demo.py --conf 0.35
   
+  # Validate dependencies and configuration only (fast, no model load)
+  python run_demo.py --model models/best.onnx --dry-run
+  
+  # Show where startup time goes (per import and model load)
+  python run_demo.py --startup-report
+  
+  # Overlap capture, inference and display on separate threads
+  python run_demo.py --pipelined
+  
   # All options combined
   python run_demo.py --source video.mp4 --model models/best.pt --output result.mp4 --conf 0.45
 
@@ -116,50 +176,173 @@ CONTROLS (during demo):
                        help='Video source: 0 for webcam, or path to video file (default: 0)')
     parser.add_argument('--model', type=str, default='models/best.pt',
                        help='Path to YOLOv8 model weights (default: models/best.pt)')
+    parser.add_argument('--backend', type=str, default='auto',
+                       choices=['auto', 'ultralytics', 'onnx'],
+                       help='Inference backend; auto uses ONNX Runtime for .onnx models (default: auto)')
     parser.add_argument('--conf', type=float, default=0.5,
                        help='Confidence threshold for detections (default: 0.5)')
     parser.add_argument('--output', type=str, default=None,
                        help='Output video file path (optional)')
+    parser.add_argument('--motion-gate', action='store_true',
+                       help='Skip detection on static frames and reuse the last detections')
+    parser.add_argument('--motion-threshold', type=float, default=0.01,
+                       help='Fraction of changed pixels that counts as motion (default: 0.01)')
+    parser.add_argument('--roi-config', type=str, default=None,
+                       help='JSON file with per-camera scan zones; only these regions are detected')
+    parser.add_argument('--camera', type=str, default='default',
+                       help='Camera id to read from --roi-config (default: default)')
+    parser.add_argument('--tile-size', type=int, default=None,
+                       help='Tiled detection for high-resolution cameras, e.g. 640 (default: off)')
+    parser.add_argument('--tile-overlap', type=float, default=0.2,
+                       help='Overlap fraction between neighbouring tiles (default: 0.2)')
+    parser.add_argument('--latency-budget', type=float, default=None,
+                       help='Per-frame inference budget in ms; lowers input size under load (default: off)')
+    parser.add_argument('--imgsz-options', type=str, default='320,416,512,640',
+                       help='Comma-separated input sizes the latency controller may use (default: 320,416,512,640)')
+    parser.add_argument('--model-cache', type=str, default=None, metavar='DIR',
+                       help='Cache exported model artifacts in DIR so restarts skip re-export (default: off)')
+    parser.add_argument('--no-warmup', action='store_true',
+                       help='Skip the dummy warmup inference at startup')
+    parser.add_argument('--cascade-model', type=str, default=None,
+                       help='Larger model that re-scores uncertain detections, e.g. yolov8l (default: off)')
+    parser.add_argument('--cascade-band', type=str, default='0.25,0.6',
+                       help='Confidence band "low,high" re-scored by --cascade-model (default: 0.25,0.6)')
+    parser.add_argument('--allowed-classes', type=str, default=None, metavar='FILE',
+                       help='File listing the classes this lane may detect; reloaded when edited (default: all)')
+    parser.add_argument('--no-tracking', action='store_true',
+                       help='Deduplicate cart items by name cooldown instead of IoU tracking')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Frames per batched inference call, e.g. 4-8 for video files (default: 1)')
+    parser.add_argument('--pipelined', action='store_true',
+                       help='Run capture, inference and display on separate threads (drops stale frames on live sources)')
+    parser.add_argument('--headless', action='store_true',
+                       help='Run without a display window (back-office nodes); draw only for --output')
+    parser.add_argument('--render-fps', type=float, default=None,
+                       help='Maximum overlay drawing rate, e.g. 10 while inferring at 30 (default: every frame)')
+    parser.add_argument('--journal', type=str, default=None, metavar='FILE',
+                       help='Cart journal for crash recovery; an existing cart is resumed (default: off)')
+    parser.add_argument('--event-log', type=str, default=None, metavar='FILE',
+                       help='Also write cart/detector events as JSON lines to FILE, rotated at 10 MB (default: off)')
+    parser.add_argument('--log-level', type=str, default='info',
+                       choices=['debug', 'info', 'warning', 'error'],
+                       help='Minimum level of logged events (default: info)')
     parser.add_argument('--skip-check', action='store_true',
                        help='Skip dependency check')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Check dependencies and configuration, then exit without loading the model')
+    parser.add_argument('--startup-report', action='store_true',
+                       help='Print a per-import startup time breakdown before processing starts')
     
     args = parser.parse_args()
     
+    # Resolve the backend by file extension only (no heavy imports yet)
+    if args.backend == 'auto':
+        backend = 'onnx' if args.model.lower().endswith('.onnx') else 'ultralytics'
+    else:
+        backend = args.backend
+    
     # Check dependencies
-    if not args.skip_check and not check_dependencies():
+    if not args.skip_check and not check_dependencies(backend):
         print("\n[!] Please install missing dependencies first")
         return 1
     
+    errors = validate_config(args)
+    if errors:
+        print("[!] Invalid configuration:")
+        for error in errors:
+            print(f"    - {error}")
+        return 1
+    
     # Check model
     print("[*] Checking model...")
-    check_model(args.model)
+    model_found = check_model(args.model)
     
     # Display configuration
     print("[*] Configuration:")
     print(f"    Source: {args.source if args.source != '0' else 'Webcam (0)'}")
     print(f"    Model: {args.model}")
+    print(f"    Backend: {backend}" + (" (auto)" if args.backend == 'auto' else ""))
     print(f"    Confidence threshold: {args.conf}")
-    print(f"    Output video: {args.output if args.output else 'No (display only)'}")
+    if args.headless:
+        print(f"    Output video: {args.output if args.output else 'No (headless, nothing drawn)'}")
+    else:
+        print(f"    Output video: {args.output if args.output else 'No (display only)'}")
+    if args.render_fps:
+        print(f"    Render rate: {args.render_fps:g} fps")
+    print(f"    Batch size: {args.batch_size}" + (" (pipelined)" if args.pipelined else ""))
+    print(f"    Motion gate: {f'On (threshold {args.motion_threshold:g})' if args.motion_gate else 'Off'}")
+    print(f"    Scan zones: {f'{args.roi_config} ({args.camera})' if args.roi_config else 'Full frame'}")
+    print(f"    Cart journal: {args.journal if args.journal else 'Off'}")
+    print(f"    Event log: {args.event_log if args.event_log else 'Console only'} (level {args.log_level})")
+    
+    if args.dry_run:
+        if not model_found:
+            print(f"\n[!] Dry run: model file not found: {args.model}")
+            return 1
+        print("\n[✓] Dry run: configuration is valid, model not loaded")
+        return 0
     
     # Import and run
     print("\n[*] Initializing FastBillingX Checkout System...")
     try:
-        from src.main import FastBillingXCheckout
+        # Heavy modules are imported here, and only the ones this backend needs
+        profiler = StartupProfiler()
+        profiler.time_import('numpy')
+        profiler.time_import('cv2')
+        profiler.time_import('onnxruntime' if backend == 'onnx' else 'ultralytics')
+        main_module = profiler.time_import('src.main')
+        FastBillingXCheckout = main_module.FastBillingXCheckout
+        from src.motion import MotionGate
+        from src.roi import load_scan_zones
+        from src.adaptive import AdaptiveResolution
+        from src.model_cache import ModelCache
+        from src.event_sink import EventSink, RotatingFileOutput, StdoutOutput, set_sink
+        
+        outputs = [StdoutOutput()]
+        if args.event_log:
+            outputs.append(RotatingFileOutput(args.event_log))
+        set_sink(EventSink(outputs, level=args.log_level))
+        
+        adaptive_resolution = None
+        if args.latency_budget:
+            sizes = [int(size) for size in args.imgsz_options.split(',')]
+            adaptive_resolution = AdaptiveResolution(args.latency_budget, sizes)
         
         # Create checkout instance
-        checkout = FastBillingXCheckout(
-            model_path=args.model,
-            conf_threshold=args.conf
-        )
+        with profiler.phase('model load + warmup'):
+            checkout = FastBillingXCheckout(
+                model_path=args.model,
+                conf_threshold=args.conf,
+                backend=args.backend,
+                motion_gate=MotionGate(min_changed_fraction=args.motion_threshold) if args.motion_gate else None,
+                scan_zones=load_scan_zones(args.roi_config, args.camera) if args.roi_config else None,
+                tile_size=args.tile_size,
+                tile_overlap=args.tile_overlap,
+                adaptive_resolution=adaptive_resolution,
+                model_cache=ModelCache(args.model_cache) if args.model_cache else None,
+                warmup=not args.no_warmup,
+                cascade_model=args.cascade_model,
+                cascade_band=tuple(float(value) for value in args.cascade_band.split(',')),
+                allowed_classes=args.allowed_classes,
+                use_tracking=not args.no_tracking,
+                journal_path=args.journal
+            )
         
         print("[✓] System initialized!\n")
+        if args.startup_report:
+            print(profiler.report() + "\n")
         print("[*] Starting video processing...")
-        print("    Press any key in the window to see controls\n")
+        if not args.headless:
+            print("    Press any key in the window to see controls\n")
         
         # Run the demo
         checkout.run(
             source=args.source if args.source != '0' else 0,
-            output_file=args.output
+            output_file=args.output,
+            batch_size=max(1, args.batch_size),
+            pipelined=args.pipelined,
+            headless=args.headless,
+            render_fps=args.render_fps
         )
         
         print("\n[✓] Demo completed successfully!")
@@ -0,0 +1,97 @@
+from collections import deque
+
+
+class AdaptiveResolution:
+    """
+    Picks the model input size that keeps inference within a latency budget
+
+    Recent per-frame inference times are averaged over a sliding window.
+    When the average exceeds the budget the controller steps down to the
+    next smaller input size; when the predicted latency at the next larger
+    size fits comfortably inside the budget it steps back up.
+    """
+
+    def __init__(self, budget_ms, sizes=(320, 416, 512, 640), window=10, headroom=0.8,
+                 cooldown=10, initial_size=None):
+        """
+        Args:
+            budget_ms: Target inference latency per frame (milliseconds)
+            sizes: Allowed input sizes (multiples of the model stride, 32)
+            window: Number of recent frames averaged per decision
+            headroom: Step up only if the predicted latency is below
+                      budget_ms * headroom
+            cooldown: Minimum frames between two switches
+            initial_size: Starting size (default: largest)
+        """
+        self.budget_ms = budget_ms
+        self.sizes = sorted(sizes)
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.window = window
+
+        self.index = self.sizes.index(initial_size) if initial_size else len(self.sizes) - 1
+        self.latencies = deque(maxlen=window)
+        self.frames_since_switch = 0
+        self.switches = 0
+        self.last_latency_ms = 0.0
+
+    @property
+    def imgsz(self):
+        """
+        Input size to use for the next inference
+        """
+        return self.sizes[self.index]
+
+    def record(self, latency_ms):
+        """
+        Report the inference latency of one frame and adapt the input size
+
+        Args:
+            latency_ms: Measured per-frame inference time (milliseconds)
+        """
+        self.last_latency_ms = latency_ms
+        self.latencies.append(latency_ms)
+        self.frames_since_switch += 1
+
+        if len(self.latencies) < self.window or self.frames_since_switch < self.cooldown:
+            return
+
+        average = self.average_latency_ms()
+        if average > self.budget_ms and self.index > 0:
+            self._switch(self.index - 1)
+        elif self.index < len(self.sizes) - 1:
+            # Cost grows roughly with the number of input pixels
+            scale = (self.sizes[self.index + 1] / self.imgsz) ** 2
+            if average * scale <= self.budget_ms * self.headroom:
+                self._switch(self.index + 1)
+
+    def _switch(self, index):
+        """
+        Move to another input size and restart measurements
+        """
+        self.index = index
+        self.latencies.clear()
+        self.frames_since_switch = 0
+        self.switches += 1
+
+    def average_latency_ms(self):
+        """
+        Mean latency over the current window (0 if no samples)
+        """
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def get_state(self):
+        """
+        Get controller state for logging/charting
+
+        Returns:
+            Dictionary with the current size, budget and latency figures
+        """
+        return {
+            'imgsz': self.imgsz,
+            'budget_ms': self.budget_ms,
+            'avg_latency_ms': self.average_latency_ms(),
+            'last_latency_ms': self.last_latency_ms,
+            'switches': self.switches,
+            'sizes': list(self.sizes)
+        }
@@ -0,0 +1,289 @@
+import ast
+import os
+
+import cv2
+import numpy as np
+
+from src.box_ops import nms, xywh_to_xyxy
+
+
+def _empty_output():
+    """
+    Raw output for a frame with no detections
+    """
+    return (
+        np.zeros((0, 4), dtype=np.float32),
+        np.zeros(0, dtype=np.float32),
+        np.zeros(0, dtype=np.int32)
+    )
+
+
+class InferenceBackend:
+    """
+    Base class for detection engines used by ProductDetector
+
+    A backend turns a list of BGR frames into raw per-frame arrays
+    (boxes, scores, class_ids) in original frame coordinates. It also
+    exposes `names`, a mapping of class id -> class name, and
+    `default_imgsz`, the input size used when infer() gets no imgsz.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self.names = {}
+        self.default_imgsz = 640
+
+    def infer(self, frames, conf_threshold, imgsz=None, classes=None):
+        """
+        Run detection on a batch of frames
+
+        Args:
+            frames: List of BGR images
+            conf_threshold: Minimum confidence to keep a box
+            imgsz: Optional model input size (square); backends that cannot
+                   change their input size ignore it
+            classes: Optional array of allowed class ids; other classes are
+                     dropped before NMS
+
+        Returns:
+            List of (boxes, scores, class_ids) tuples, one per frame
+        """
+        raise NotImplementedError
+
+
+class UltralyticsBackend(InferenceBackend):
+    """
+    YOLOv8 engine backed by the ultralytics package (PyTorch)
+    """
+
+    name = 'ultralytics'
+
+    def __init__(self, model_path):
+        super().__init__()
+        # Imported here so ONNX-only deployments never load torch
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def infer(self, frames, conf_threshold, imgsz=None, classes=None):
+        options = {'imgsz': imgsz} if imgsz else {}
+        if classes is not None:
+            # ultralytics applies the class list inside its NMS
+            options['classes'] = [int(class_id) for class_id in classes]
+        results = self.model(list(frames), conf=conf_threshold, verbose=False, **options)
+
+        outputs = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                outputs.append(_empty_output())
+                continue
+            # Move each column to host once per frame
+            outputs.append((
+                boxes.xyxy.cpu().numpy(),
+                boxes.conf.cpu().numpy(),
+                boxes.cls.cpu().numpy().astype(np.int32)
+            ))
+        return outputs
+
+
+def letterbox(image, new_shape=(640, 640), color=(114, 114, 114)):
+    """
+    Resize an image to fit new_shape while keeping aspect ratio, padding the rest
+
+    Args:
+        image: BGR image
+        new_shape: Target (height, width)
+        color: Padding color
+
+    Returns:
+        (padded_image, scale, (pad_x, pad_y))
+    """
+    h, w = image.shape[:2]
+    new_h, new_w = new_shape
+    scale = min(new_h / h, new_w / w)
+
+    resized_w, resized_h = int(round(w * scale)), int(round(h * scale))
+    pad_x = (new_w - resized_w) / 2
+    pad_y = (new_h - resized_h) / 2
+
+    if (resized_w, resized_h) != (w, h):
+        image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+
+    return padded, scale, (left, top)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    CPU engine for YOLOv8 models exported to ONNX (models/train.py)
+
+    Runs without torch or ultralytics: letterbox preprocessing, the forward
+    pass and NMS are all done with OpenCV, ONNX Runtime and NumPy. Expects the
+    standard YOLOv8 export layout, an output of shape (batch, 4 + nc, anchors).
+    """
+
+    name = 'onnx'
+
+    def __init__(self, model_path, iou_threshold=0.45, max_detections=300, num_threads=None):
+        """
+        Args:
+            model_path: Path to the .onnx file
+            iou_threshold: IoU threshold for NMS
+            max_detections: Maximum boxes kept per frame
+            num_threads: Intra-op thread count (default: ONNX Runtime's choice)
+        """
+        super().__init__()
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=['CPUExecutionProvider']
+        )
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        metadata = self.session.get_modelmeta().custom_metadata_map
+
+        # Models exported without dynamic=True only accept a fixed batch size
+        # and input size
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        self.fixed_size = isinstance(height, int) and isinstance(width, int)
+        if self.fixed_size:
+            self.input_size = (height, width)
+        elif 'imgsz' in metadata:
+            self.input_size = tuple(ast.literal_eval(metadata['imgsz']))
+        else:
+            self.input_size = (640, 640)
+        self.default_imgsz = max(self.input_size)
+
+        if 'names' in metadata:
+            self.names = ast.literal_eval(metadata['names'])
+        else:
+            num_classes = self.session.get_outputs()[0].shape[1] - 4
+            self.names = {i: f"class_{i}" for i in range(num_classes)}
+
+    def infer(self, frames, conf_threshold, imgsz=None, classes=None):
+        input_size = (imgsz, imgsz) if imgsz and not self.fixed_size else self.input_size
+
+        if self.fixed_batch is None:
+            return self._infer_chunk(frames, conf_threshold, input_size, classes)
+
+        outputs = []
+        for start in range(0, len(frames), self.fixed_batch):
+            chunk = frames[start:start + self.fixed_batch]
+            outputs.extend(self._infer_chunk(chunk, conf_threshold, input_size, classes))
+        return outputs
+
+    def _infer_chunk(self, frames, conf_threshold, input_size, classes=None):
+        """
+        Preprocess, run and decode one batch the model accepts
+        """
+        letterboxed = [letterbox(frame, input_size) for frame in frames]
+        images = [padded for padded, _, _ in letterboxed]
+
+        # Pad static-batch models up to their fixed batch size
+        if self.fixed_batch is not None and len(images) < self.fixed_batch:
+            images = images + [images[-1]] * (self.fixed_batch - len(images))
+
+        # HWC BGR uint8 -> NCHW RGB float32 in [0, 1]
+        blob = cv2.dnn.blobFromImages(images, scalefactor=1 / 255.0, swapRB=True)
+        predictions = self.session.run(None, {self.input_name: blob})[0]
+
+        return [
+            self._decode(predictions[i], frame.shape[:2], scale, pad, conf_threshold, classes)
+            for i, (frame, (_, scale, pad)) in enumerate(zip(frames, letterboxed))
+        ]
+
+    def _decode(self, prediction, frame_shape, scale, pad, conf_threshold, classes=None):
+        """
+        Turn one (4 + nc, anchors) prediction into frame-space boxes
+
+        When classes is given, only those score rows are read, so pruned
+        classes are never decoded.
+        """
+        if classes is not None:
+            if len(classes) == 0:
+                return _empty_output()
+            class_scores = prediction[4 + np.asarray(classes)].T
+        else:
+            class_scores = prediction[4:].T
+
+        # Discard low-confidence anchors before doing any per-class work
+        best_scores = class_scores.max(axis=1)
+        candidates = best_scores >= conf_threshold
+        if not candidates.any():
+            return _empty_output()
+
+        scores = best_scores[candidates]
+        class_ids = class_scores[candidates].argmax(axis=1)
+        if classes is not None:
+            class_ids = np.asarray(classes)[class_ids]
+        class_ids = class_ids.astype(np.int32)
+        boxes = xywh_to_xyxy(prediction[:4, candidates].T)
+
+        keep = nms(boxes, scores, self.iou_threshold, class_ids, self.max_detections)
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        # Undo letterbox padding and scaling
+        pad_x, pad_y = pad
+        boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=boxes.dtype)
+        boxes /= scale
+        h, w = frame_shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+
+        return boxes.astype(np.float32), scores.astype(np.float32), class_ids
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+}
+
+
+def resolve_backend(model_path, backend='auto'):
+    """
+    Resolve 'auto' to a concrete backend name for a model file
+
+    Args:
+        model_path: Path to model weights
+        backend: 'auto' or an explicit backend name
+
+    Returns:
+        Backend name ('ultralytics' or 'onnx')
+    """
+    if backend == 'auto':
+        extension = os.path.splitext(str(model_path))[1].lower()
+        backend = OnnxRuntimeBackend.name if extension == '.onnx' else UltralyticsBackend.name
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (choose from: auto, {', '.join(BACKENDS)})")
+    return backend
+
+
+def create_backend(model_path, backend='auto'):
+    """
+    Build an inference backend for a model file
+
+    Args:
+        model_path: Path to model weights (.pt, .onnx, ...)
+        backend: 'auto', 'ultralytics' or 'onnx'. 'auto' picks ONNX Runtime
+                 for .onnx files and ultralytics for everything else.
+
+    Returns:
+        InferenceBackend instance
+    """
+    return BACKENDS[resolve_backend(model_path, backend)](model_path)
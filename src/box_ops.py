@@ -0,0 +1,127 @@
+import numpy as np
+
+
+def box_area(boxes):
+    """
+    Compute areas of [x1, y1, x2, y2] boxes
+
+    Args:
+        boxes: (N, 4) array
+
+    Returns:
+        (N,) array of areas
+    """
+    return (boxes[:, 2] - boxes[:, 0]).clip(min=0) * (boxes[:, 3] - boxes[:, 1]).clip(min=0)
+
+
+def _intersection(boxes_a, boxes_b):
+    """
+    Pairwise intersection areas between two sets of boxes
+    """
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    wh = (bottom_right - top_left).clip(min=0)
+    return wh[..., 0] * wh[..., 1]
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Pairwise IoU matrix between two sets of [x1, y1, x2, y2] boxes
+
+    Args:
+        boxes_a: (N, 4) array
+        boxes_b: (M, 4) array
+
+    Returns:
+        (N, M) array of IoU values
+    """
+    inter = _intersection(boxes_a, boxes_b)
+    union = box_area(boxes_a)[:, None] + box_area(boxes_b)[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def box_ios(boxes_a, boxes_b):
+    """
+    Pairwise intersection-over-smaller-area matrix
+
+    Unlike IoU this is close to 1 when one box is mostly inside the other,
+    which is what a partial box cut at a tile seam looks like.
+
+    Args:
+        boxes_a: (N, 4) array
+        boxes_b: (M, 4) array
+
+    Returns:
+        (N, M) array of IoS values
+    """
+    inter = _intersection(boxes_a, boxes_b)
+    smaller = np.minimum(box_area(boxes_a)[:, None], box_area(boxes_b)[None, :])
+    return inter / np.maximum(smaller, 1e-9)
+
+
+OVERLAP_METRICS = {
+    'iou': box_iou,
+    'ios': box_ios,
+}
+
+
+def xywh_to_xyxy(boxes):
+    """
+    Convert center-format [cx, cy, w, h] boxes to [x1, y1, x2, y2]
+    """
+    xyxy = np.empty_like(boxes)
+    half_w = boxes[:, 2] / 2
+    half_h = boxes[:, 3] / 2
+    xyxy[:, 0] = boxes[:, 0] - half_w
+    xyxy[:, 1] = boxes[:, 1] - half_h
+    xyxy[:, 2] = boxes[:, 0] + half_w
+    xyxy[:, 3] = boxes[:, 1] + half_h
+    return xyxy
+
+
+def nms(boxes, scores, iou_threshold=0.45, class_ids=None, max_detections=None, metric='iou'):
+    """
+    Greedy non-maximum suppression
+
+    Each kept box suppresses all remaining boxes above the IoU threshold in
+    one vectorized step. When class ids are given, suppression is per class
+    (a kept box only suppresses boxes of its own class).
+
+    Args:
+        boxes: (N, 4) array of [x1, y1, x2, y2]
+        scores: (N,) array of confidence scores
+        iou_threshold: Boxes overlapping a kept box by more than this are dropped
+        class_ids: Optional (N,) array for class-aware suppression
+        max_detections: Optional cap on the number of kept boxes
+        metric: Overlap measure, 'iou' or 'ios' (intersection over smaller)
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    overlap = OVERLAP_METRICS[metric]
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if class_ids is not None:
+        # Masking by class instead of offsetting coordinates keeps IoU exact
+        # for large class counts and frame-space (e.g. 4K) boxes
+        class_ids = np.asarray(class_ids)
+
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    keep = []
+
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        if max_detections is not None and len(keep) >= max_detections:
+            break
+        if order.size == 1:
+            break
+        rest = order[1:]
+        suppressed = overlap(boxes[best:best + 1], boxes[rest])[0] > iou_threshold
+        if class_ids is not None:
+            suppressed &= class_ids[rest] == class_ids[best]
+        order = rest[~suppressed]
+
+    return np.asarray(keep, dtype=np.intp)
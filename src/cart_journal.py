@@ -0,0 +1,211 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from src.cart_manager import CartManager
+
+
+class CartJournal:
+    """
+    Append-only NDJSON journal of cart changes
+
+    Every add / remove / clear is written as one short JSON line, so the
+    cost of durability is one small write per change instead of rewriting
+    the whole cart. Lines go straight to the OS (a process crash loses
+    nothing); fsync is batched by record count and elapsed time, bounding
+    what a power loss can take. Once the journal holds compact_every
+    records, the cart is written to a snapshot file and the journal is
+    truncated.
+    """
+
+    def __init__(self, path, fsync_every=64, fsync_interval=0.5, compact_every=10000, start_seq=0):
+        """
+        Args:
+            path: Journal file; the snapshot is stored next to it
+                  (<path>.snapshot)
+            fsync_every: Records between fsync calls
+            fsync_interval: Maximum seconds between fsync calls
+            compact_every: Journal records that trigger snapshot compaction
+            start_seq: Sequence number of the last record already on disk
+                       (set by recover_cart)
+        """
+        self.path = path
+        self.snapshot_path = path + '.snapshot'
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self.seq = start_seq
+        self.records_since_compact = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab', buffering=0)
+
+    def _append(self, record):
+        self.seq += 1
+        record['seq'] = self.seq
+        self._file.write((json.dumps(record, separators=(',', ':')) + '\n').encode())
+        self.records_since_compact += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def log_session(self, session_id, start_time):
+        """
+        Record the session a (new) journal belongs to
+        """
+        self._append({'op': 'session', 'session_id': session_id, 'start_time': start_time.isoformat()})
+
+    def log_add(self, timestamp, added):
+        """
+        Record one batch of accepted (name, confidence, bbox, price) events
+        """
+        self._append({'op': 'add', 't': timestamp, 'items': [list(event) for event in added]})
+
+    def log_remove(self, name, quantity):
+        """
+        Record a removal
+        """
+        self._append({'op': 'remove', 't': time.time(), 'name': name, 'quantity': quantity})
+
+    def log_clear(self):
+        """
+        Record a cart clear
+        """
+        self._append({'op': 'clear', 't': time.time()})
+
+    def sync(self):
+        """
+        Force journal records to stable storage
+        """
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def needs_compaction(self):
+        return self.records_since_compact >= self.compact_every
+
+    def compact(self, snapshot):
+        """
+        Write a snapshot of the cart and truncate the journal
+
+        The snapshot is written to a temporary file, fsynced and atomically
+        renamed, and carries the sequence number it covers, so a crash at
+        any point leaves a state that recovers to the same cart.
+
+        Args:
+            snapshot: Dictionary from CartManager.snapshot()
+        """
+        snapshot = dict(snapshot, seq=self.seq)
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        self._file.truncate(0)
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self.records_since_compact = 0
+
+    def close(self):
+        """
+        Sync and close the journal
+        """
+        if not self._file.closed:
+            self._unsynced = max(self._unsynced, 1)
+            self.sync()
+            self._file.close()
+
+
+def _read_journal(path):
+    """
+    Read journal records, stopping at a torn or corrupt tail
+
+    Returns:
+        (records, valid_bytes)
+    """
+    records = []
+    valid_bytes = 0
+    if not os.path.exists(path):
+        return records, valid_bytes
+
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            valid_bytes += len(line)
+    return records, valid_bytes
+
+
+def recover_cart(path, dedup_cooldown=2.0, **journal_kwargs):
+    """
+    Rebuild a CartManager from its snapshot and journal, and reattach the
+    journal so the session continues where it stopped
+
+    A partially written last record (crash mid-write) is discarded. A
+    missing journal starts a new session.
+
+    Args:
+        path: Journal file
+        dedup_cooldown: CartManager dedup cooldown
+        **journal_kwargs: Extra CartJournal arguments
+
+    Returns:
+        CartManager with the recovered cart and an open journal
+    """
+    snapshot = None
+    snapshot_path = path + '.snapshot'
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path) as f:
+            snapshot = json.load(f)
+
+    records, valid_bytes = _read_journal(path)
+    if os.path.exists(path) and os.path.getsize(path) != valid_bytes:
+        print(f"[!] Discarding torn tail of cart journal {path}")
+        with open(path, 'r+b') as f:
+            f.truncate(valid_bytes)
+
+    if snapshot is None and not records:
+        return CartManager(dedup_cooldown=dedup_cooldown, journal=CartJournal(path, **journal_kwargs))
+
+    manager = CartManager(dedup_cooldown=dedup_cooldown)
+    last_seq = 0
+    if snapshot is not None:
+        manager.restore(snapshot)
+        last_seq = snapshot['seq']
+
+    replayed = 0
+    for record in records:
+        if record['seq'] <= last_seq:
+            # Already covered by the snapshot (crash during compaction)
+            continue
+        last_seq = record['seq']
+        replayed += 1
+        op = record['op']
+        if op == 'add':
+            manager._apply_add(record['t'], [tuple(event) for event in record['items']])
+        elif op == 'remove':
+            manager._apply_remove(record['name'], record['quantity'])
+        elif op == 'clear':
+            manager.cart.clear()
+            manager._changed()
+        elif op == 'session':
+            manager.session_id = record['session_id']
+            manager.start_time = datetime.fromisoformat(record['start_time'])
+
+    manager.journal = CartJournal(path, start_seq=last_seq, **journal_kwargs)
+    manager.journal.records_since_compact = len(records)
+    print(f"[✓] Recovered cart {manager.session_id}: {manager.get_item_count()} items, "
+          f"${manager.get_total():.2f} ({replayed} journal records replayed)")
+    return manager
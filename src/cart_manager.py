@@ -1,16 +1,28 @@
 import json
 import time
+import uuid
 from collections import defaultdict
 from datetime import datetime
 
+from src.event_log import EventLog
+from src.event_sink import get_sink
+
 
 class CartManager:
-    def __init__(self, dedup_cooldown=2.0):
+    def __init__(self, dedup_cooldown=2.0, history_capacity=10000, history_spill_path=None, journal=None,
+                 event_sink=None, session_id=None):
         """
         Initialize shopping cart manager with deduplication logic
         
         Args:
             dedup_cooldown: Seconds to wait before adding same item again (default: 2.0)
+            history_capacity: Maximum add events kept in memory
+            history_spill_path: Optional NDJSON file for events that no longer
+                                fit in memory (default: oldest are dropped)
+            journal: Optional CartJournal that records every cart change
+                     (use cart_journal.recover_cart to reopen one)
+            event_sink: EventSink for cart events (default: process-wide sink)
+            session_id: Session id (default: new unique id)
         """
         self.cart = defaultdict(lambda: {
             'quantity': 0, 
@@ -19,11 +31,24 @@ class CartManager:
             'price': 0,
             'confidence': 0
         })
-        self.cart_history = []
-        self.session_id = f"cart_{int(time.time())}"
+        self.history = EventLog(history_capacity, history_spill_path)
+        # Random suffix keeps ids unique across lanes starting in the same second
+        self.session_id = session_id or f"cart_{int(time.time())}_{uuid.uuid4().hex[:12]}"
         self.dedup_cooldown = dedup_cooldown
         self.start_time = datetime.now()
         
+        # Running aggregates, kept in step with the cart on every change
+        self._total = 0.0
+        self._item_count = 0
+        self._summary = None
+        # Bumped on every change so consumers can skip work on unchanged carts
+        self.version = 0
+        
+        self.event_sink = event_sink
+        self.journal = journal
+        if journal is not None:
+            journal.log_session(self.session_id, self.start_time)
+        
     def add_item(self, name, confidence, bbox=None, price=1.00):
         """
         Add detected item to cart with deduplication logic
@@ -37,34 +62,101 @@ class CartManager:
         Returns:
             True if item was added, False if skipped due to dedup cooldown
         """
-        current_time = time.time()
+        detection = {'name': name, 'confidence': confidence, 'bbox': bbox, 'price': price}
+        return self.add_items([detection]) == 1
+    
+    def add_items(self, detections, timestamp=None):
+        """
+        Add one frame's detections to the cart in a single pass
         
-        # Deduplication check - prevent duplicate additions within cooldown period
-        if name in self.cart:
-            last_time = self.cart[name].get('last_detected', 0)
-            if current_time - last_time < self.dedup_cooldown:
-                return False
+        Dedup is applied across the whole batch, cart aggregates are updated
+        once per product and history is appended in one step.
         
-        # Update cart
-        self.cart[name]['quantity'] += 1
-        self.cart[name]['total_price'] += price
-        self.cart[name]['last_detected'] = current_time
-        self.cart[name]['price'] = price
-        self.cart[name]['confidence'] = confidence
+        Args:
+            detections: Detections (columnar) or list of detection dictionaries
+            timestamp: Frame time in seconds since epoch (default: now)
+            
+        Returns:
+            Number of items added
+        """
+        if timestamp is None:
+            timestamp = time.time()
         
-        # Log to history
-        cart_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'item': name,
-            'price': price,
-            'confidence': confidence,
-            'session_id': self.session_id,
-            'bbox': bbox
-        }
-        self.cart_history.append(cart_entry)
+        if hasattr(detections, 'scores'):
+            # Columnar results: convert each column once
+            rows = zip(
+                detections.names,
+                detections.scores.tolist(),
+                detections.boxes.astype(int).tolist(),
+                detections.prices.tolist()
+            )
+        else:
+            rows = (
+                (d['name'], d['confidence'], d.get('bbox'), d.get('price', 1.00))
+                for d in detections
+            )
+        
+        # With no cooldown (tracking dedups upstream) every row is added, even
+        # if the wall clock stepped backwards since the last add
+        dedup = self.dedup_cooldown > 0
+        seen = set()
+        added = []
+        for name, confidence, bbox, price in rows:
+            if not dedup:
+                added.append((name, confidence, bbox, price))
+                continue
+            # Deduplication check - prevent duplicate additions within cooldown period
+            if name in seen:
+                last_time = timestamp
+            else:
+                entry = self.cart.get(name)
+                last_time = entry['last_detected'] if entry else None
+            if last_time is not None and timestamp - last_time < self.dedup_cooldown:
+                continue
+            
+            seen.add(name)
+            added.append((name, confidence, bbox, price))
+        
+        if not added:
+            return 0
+        
+        self._apply_add(timestamp, added)
+        if self.journal is not None:
+            self.journal.log_add(timestamp, added)
+            self._maybe_compact()
         
-        print(f"✓ Added to cart: {name} (${price:.2f}) - Confidence: {confidence:.2f}")
-        return True
+        for name, confidence, bbox, price in added:
+            self._emit(
+                'cart.add', "✓ Added to cart: {name} (${price:.2f}) - Confidence: {confidence:.2f}",
+                name=name, price=price, confidence=confidence, bbox=bbox
+            )
+        return len(added)
+    
+    def _apply_add(self, timestamp, added):
+        """
+        Apply accepted (name, confidence, bbox, price) events to the cart
+        """
+        pending = {}
+        for name, confidence, bbox, price in added:
+            totals = pending.setdefault(name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += price
+        
+        # Update cart aggregates once per product
+        for name, (quantity, total_price) in pending.items():
+            item = self.cart[name]
+            item['quantity'] += quantity
+            item['total_price'] += total_price
+            item['last_detected'] = timestamp
+            self._item_count += quantity
+            self._total += total_price
+        for name, confidence, bbox, price in added:
+            self.cart[name]['price'] = price
+            self.cart[name]['confidence'] = confidence
+        
+        # Log to history
+        self.history.extend(timestamp, added)
+        self._changed()
     
     def remove_item(self, name, quantity=1):
         """
@@ -77,31 +169,80 @@ class CartManager:
         Returns:
             Amount removed (total price)
         """
-        if name in self.cart:
-            current_qty = self.cart[name]['quantity']
-            price = self.cart[name].get('price', 0)
-            
-            if quantity >= current_qty:
-                removed_price = self.cart[name]['total_price']
-                del self.cart[name]
-                print(f"Removed all {name} from cart (${removed_price:.2f})")
-                return removed_price
-            else:
-                self.cart[name]['quantity'] -= quantity
-                self.cart[name]['total_price'] -= price * quantity
-                removed_price = price * quantity
-                print(f"Removed {quantity} {name}(s) from cart (${removed_price:.2f})")
-                return removed_price
-        return 0
+        removed = self._apply_remove(name, quantity)
+        if removed is None:
+            return 0
+        
+        removed_qty, removed_price = removed
+        if self.journal is not None:
+            self.journal.log_remove(name, quantity)
+            self._maybe_compact()
+        
+        if name not in self.cart:
+            message = "Removed all {name} from cart (${amount:.2f})"
+        else:
+            message = "Removed {quantity} {name}(s) from cart (${amount:.2f})"
+        self._emit('cart.remove', message, name=name, quantity=removed_qty, amount=removed_price)
+        return removed_price
+    
+    def _apply_remove(self, name, quantity):
+        """
+        Remove up to quantity units of a product
+        
+        Returns:
+            (quantity removed, amount removed), or None if not in cart
+        """
+        if name not in self.cart:
+            return None
+        
+        current_qty = self.cart[name]['quantity']
+        price = self.cart[name].get('price', 0)
+        
+        if quantity >= current_qty:
+            removed_qty = current_qty
+            removed_price = self.cart[name]['total_price']
+            del self.cart[name]
+        else:
+            removed_qty = quantity
+            removed_price = price * quantity
+            self.cart[name]['quantity'] -= quantity
+            self.cart[name]['total_price'] -= removed_price
+        
+        self._item_count -= removed_qty
+        self._total -= removed_price
+        self._changed()
+        return removed_qty, removed_price
+    
+    @property
+    def cart_history(self):
+        """
+        Add events as a list of dictionaries (formatted on access)
+        """
+        return self.history.to_dicts(self.session_id)
+    
+    def _changed(self):
+        """
+        Mark the cart as modified
+        """
+        self.version += 1
+        self._summary = None
+        if not self.cart:
+            # Reset accumulated float drift whenever the cart empties
+            self._total = 0.0
+            self._item_count = 0
     
     def get_cart_summary(self):
         """
         Get current cart state
         
+        The summary is rebuilt only after the cart changed (see version).
+        
         Returns:
             Dictionary of cart items with details
         """
-        return dict(self.cart)
+        if self._summary is None:
+            self._summary = dict(self.cart)
+        return self._summary
     
     def get_total(self):
         """
@@ -110,8 +251,7 @@ class CartManager:
         Returns:
             Total price (float)
         """
-        total = sum(item['total_price'] for item in self.cart.values())
-        return total
+        return self._total
     
     def get_item_count(self):
         """
@@ -120,14 +260,84 @@ class CartManager:
         Returns:
             Total item count (int)
         """
-        return sum(item['quantity'] for item in self.cart.values())
+        return self._item_count
     
     def clear_cart(self):
         """
         Clear all items from cart
         """
         self.cart.clear()
-        print("Cart cleared!")
+        self._changed()
+        if self.journal is not None:
+            self.journal.log_clear()
+            self._maybe_compact()
+        self._emit('cart.clear', "Cart cleared!")
+    
+    def _emit(self, event, message, level='info', **fields):
+        """
+        Queue a cart event on the event sink (never blocks on output)
+        """
+        sink = self.event_sink if self.event_sink is not None else get_sink()
+        sink.emit(event, message, level=level, session_id=self.session_id, **fields)
+    
+    def _maybe_compact(self):
+        """
+        Replace the journal with a snapshot (including the add history) once
+        it has grown long enough
+        """
+        if self.journal.needs_compaction():
+            self.journal.compact(self.snapshot(include_history=True))
+    
+    def snapshot(self, include_history=False):
+        """
+        Serializable copy of the cart state (contents and session)
+        
+        Args:
+            include_history: Also include the in-memory add history
+            
+        Returns:
+            Dictionary accepted by from_snapshot
+        """
+        snapshot = {
+            'session_id': self.session_id,
+            'start_time': self.start_time.isoformat(),
+            'cart': {name: dict(details) for name, details in self.cart.items()}
+        }
+        if include_history:
+            snapshot['history'] = self.history.export_raw()
+        return snapshot
+    
+    @classmethod
+    def from_snapshot(cls, snapshot, **kwargs):
+        """
+        Build a cart manager from a snapshot
+        
+        Args:
+            snapshot: Dictionary returned by snapshot()
+            **kwargs: CartManager constructor arguments
+            
+        Returns:
+            CartManager with the snapshot's contents
+        """
+        manager = cls(**kwargs)
+        manager.restore(snapshot)
+        return manager
+    
+    def restore(self, snapshot):
+        """
+        Replace the cart state with a snapshot's contents
+        """
+        self.session_id = snapshot['session_id']
+        self.start_time = datetime.fromisoformat(snapshot['start_time'])
+        self.cart.clear()
+        for name, details in snapshot['cart'].items():
+            self.cart[name].update(details)
+        self._total = sum(item['total_price'] for item in self.cart.values())
+        self._item_count = sum(item['quantity'] for item in self.cart.values())
+        if 'history' in snapshot:
+            self.history.clear()
+            self.history.import_raw(snapshot['history'])
+        self._changed()
     
     def save_cart_to_file(self, filename=None):
         """
@@ -165,7 +375,7 @@ class CartManager:
         with open(filename, 'w') as f:
             json.dump(cart_data, f, indent=2)
         
-        print(f"Cart saved to {filename}")
+        self._emit('cart.save', "Cart saved to {path}", path=filename)
         return filename
     
     def generate_receipt(self):
@@ -204,16 +414,64 @@ class CartManager:
         Export cart in format suitable for backend API integration
         
         Returns:
-            List of items in API format
+            List of items in API format (one entry per unit)
         """
-        items = []
-        for item_name, details in self.cart.items():
-            for _ in range(details['quantity']):
-                items.append({
-                    'session_id': self.session_id,
-                    'item_name': item_name,
-                    'price': details['price'],
-                    'confidence': details['confidence'],
-                    'timestamp': datetime.now().isoformat()
-                })
-        return items
+        return list(self.iter_api_records())
+    
+    def iter_api_records(self, aggregated=False):
+        """
+        Stream cart records in API format without building a list
+        
+        Args:
+            aggregated: One record per product with a quantity field instead
+                        of one record per unit
+            
+        Yields:
+            API record dictionaries
+        """
+        timestamp = datetime.now().isoformat()
+        for item_name, details in list(self.cart.items()):
+            record = {
+                'session_id': self.session_id,
+                'item_name': item_name,
+                'price': details['price'],
+                'confidence': details['confidence'],
+                'timestamp': timestamp
+            }
+            if aggregated:
+                record['quantity'] = details['quantity']
+                record['total_price'] = details['total_price']
+                yield record
+            else:
+                for _ in range(details['quantity']):
+                    yield dict(record)
+    
+    def export_aggregated(self):
+        """
+        Export cart with one API record per product
+        
+        Returns:
+            List of records with quantity and total_price
+        """
+        return list(self.iter_api_records(aggregated=True))
+    
+    def write_api_ndjson(self, file, aggregated=True):
+        """
+        Write API records as NDJSON (one JSON object per line)
+        
+        Args:
+            file: Output path or writable text file object
+            aggregated: One line per product (default) or per unit
+            
+        Returns:
+            Number of records written
+        """
+        if isinstance(file, str):
+            with open(file, 'w') as f:
+                return self.write_api_ndjson(f, aggregated)
+        
+        count = 0
+        for record in self.iter_api_records(aggregated):
+            file.write(json.dumps(record) + '\n')
+            count += 1
+        return count
@@ -0,0 +1,139 @@
+import numpy as np
+
+from src.box_ops import box_iou, nms
+from src.detections import Detections
+
+
+class CascadeRescorer:
+    """
+    Second stage of a two-model cascade
+
+    A small model (e.g. yolov8n) detects on every frame. Boxes it is sure
+    about are kept as they are; boxes whose confidence falls inside the
+    uncertainty band are cropped and re-scored by a larger model (e.g.
+    yolov8l), all crops in one batch. Both models must share the same class
+    list (trained on the same dataset.yaml).
+    """
+
+    def __init__(self, backend, low=0.25, high=0.6, padding=0.15, crop_imgsz=320, match_iou=0.3,
+                 merge_iou=0.5):
+        """
+        Args:
+            backend: InferenceBackend of the larger model
+            low: Boxes below this primary confidence are discarded
+            high: Boxes at or above this primary confidence skip re-scoring
+            padding: Context added around each crop (fraction of box size)
+            crop_imgsz: Input size for the larger model on crops
+            match_iou: Minimum IoU between the original box and the larger
+                       model's box for the re-score to count
+            merge_iou: IoU above which same-class boxes of the merged result
+                       are treated as one item (e.g. two uncertain boxes of
+                       different classes re-scored to the same class)
+        """
+        if not 0 <= low <= high <= 1:
+            raise ValueError(f"Invalid cascade band ({low}, {high})")
+        self.backend = backend
+        self.low = low
+        self.high = high
+        self.padding = padding
+        self.crop_imgsz = crop_imgsz
+        self.match_iou = match_iou
+        self.merge_iou = merge_iou
+
+        self.boxes_seen = 0
+        self.boxes_rescored = 0
+        self.boxes_confirmed = 0
+
+    def _crop_bounds(self, box, frame_shape):
+        """
+        Padded, clipped integer crop rectangle around a box
+        """
+        h, w = frame_shape[:2]
+        x1, y1, x2, y2 = box
+        pad_x = (x2 - x1) * self.padding
+        pad_y = (y2 - y1) * self.padding
+        return (
+            max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y)),
+            min(w, int(np.ceil(x2 + pad_x))), min(h, int(np.ceil(y2 + pad_y)))
+        )
+
+    def refine(self, frames, results, conf_threshold, price_fn, classes=None):
+        """
+        Re-score the uncertain detections of a batch of frames
+
+        Args:
+            frames: List of BGR frames
+            results: List of Detections from the small model (one per frame)
+            conf_threshold: Minimum final confidence; applies to confident
+                            small-model boxes and to larger-model re-scores
+            price_fn: Callable mapping a class id array to a price array
+            classes: Optional allowed class ids for the larger model
+
+        Returns:
+            List of Detections in the usual format
+        """
+        crops = []
+        owners = []
+        for frame_index, (frame, detections) in enumerate(zip(frames, results)):
+            self.boxes_seen += len(detections)
+            uncertain = np.flatnonzero((detections.scores >= self.low) & (detections.scores < self.high))
+            for row in uncertain:
+                x1, y1, x2, y2 = self._crop_bounds(detections.boxes[row], frame.shape)
+                if x2 <= x1 or y2 <= y1:
+                    continue
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((frame_index, row, x1, y1))
+
+        rescored = [[] for _ in frames]
+        if crops:
+            self.boxes_rescored += len(crops)
+            outputs = self.backend.infer(crops, conf_threshold, imgsz=self.crop_imgsz, classes=classes)
+            for (frame_index, row, x1, y1), (boxes, scores, class_ids) in zip(owners, outputs):
+                if len(boxes) == 0:
+                    continue
+                boxes = boxes + np.array([x1, y1, x1, y1], dtype=np.float32)
+                original = results[frame_index].boxes[row:row + 1]
+                ious = box_iou(original, boxes)[0]
+                matches = np.flatnonzero(ious >= self.match_iou)
+                if len(matches) == 0:
+                    continue
+                best = matches[np.argmax(scores[matches])]
+                rescored[frame_index].append((boxes[best], scores[best], class_ids[best]))
+                self.boxes_confirmed += 1
+
+        # Confident boxes skip re-scoring but must still meet the caller's threshold
+        keep_threshold = max(self.high, conf_threshold)
+        refined = []
+        for detections, frame_rescored in zip(results, rescored):
+            confident = detections.select(detections.scores >= keep_threshold)
+            if not frame_rescored:
+                refined.append(confident)
+                continue
+            boxes, scores, class_ids = (np.array(column) for column in zip(*frame_rescored))
+            second_stage = Detections(
+                boxes=boxes,
+                scores=scores,
+                class_ids=class_ids,
+                prices=price_fn(class_ids),
+                class_names=detections.class_names
+            )
+            merged = Detections.concatenate([confident, second_stage], detections.class_names)
+            # Re-scored boxes can duplicate each other or a confident box of
+            # the same class; keep one box per item
+            keep = nms(merged.boxes, merged.scores, self.merge_iou, class_ids=merged.class_ids)
+            refined.append(merged.select(np.sort(keep)))
+        return refined
+
+    def get_stats(self):
+        """
+        Get cascade counters
+
+        Returns:
+            Dictionary with boxes seen, sent to the larger model and kept
+        """
+        return {
+            'boxes_seen': self.boxes_seen,
+            'boxes_rescored': self.boxes_rescored,
+            'boxes_confirmed': self.boxes_confirmed,
+            'rescore_ratio': self.boxes_rescored / self.boxes_seen if self.boxes_seen else 0.0
+        }
@@ -0,0 +1,124 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from src.event_sink import get_sink
+from src.pricing import normalize_name
+
+
+class ClassFilter:
+    """
+    Per-lane set of classes the detector is allowed to report
+
+    The allowed class ids are passed into inference so pruned classes are
+    never decoded or run through NMS. The set can be replaced at any time
+    (set_allowed) or loaded from a file that is re-read when it changes.
+    """
+
+    def __init__(self, class_names, allowed=None, path=None, check_interval=2.0):
+        """
+        Args:
+            class_names: Mapping of class id -> class name (model.names)
+            allowed: Optional iterable of class names and/or ids
+            path: Optional file with the allowed classes (hot-reloaded)
+            check_interval: Seconds between file modification checks
+        """
+        self.class_names = class_names
+        self._ids_by_name = {normalize_name(name): class_id for class_id, name in class_names.items()}
+        self.path = path
+        self.check_interval = check_interval
+        self.class_ids = None
+        self._mtime = None
+        self._last_check = 0.0
+
+        if path is not None:
+            self.load(path)
+        elif allowed is not None:
+            self.set_allowed(allowed)
+
+    def _resolve(self, entries):
+        """
+        Map class names/ids to a sorted array of valid class ids
+        """
+        class_ids = set()
+        unknown = []
+        for entry in entries:
+            if isinstance(entry, (int, np.integer)) or str(entry).strip().isdigit():
+                class_id = int(entry)
+                if class_id in self.class_names:
+                    class_ids.add(class_id)
+                else:
+                    unknown.append(str(entry))
+            else:
+                class_id = self._ids_by_name.get(normalize_name(entry))
+                if class_id is None:
+                    unknown.append(str(entry))
+                else:
+                    class_ids.add(class_id)
+
+        if unknown:
+            preview = ', '.join(unknown[:5]) + (', ...' if len(unknown) > 5 else '')
+            get_sink().emit(
+                'class_filter.unknown', "[!] Class filter: {count} unknown classes ignored: {preview}",
+                level='warning', count=len(unknown), preview=preview
+            )
+        return np.array(sorted(class_ids), dtype=np.int64)
+
+    def set_allowed(self, allowed):
+        """
+        Replace the allowed classes
+
+        Args:
+            allowed: Iterable of class names and/or ids, or None to allow all
+        """
+        # Single assignment, so readers always see a complete set
+        self.class_ids = None if allowed is None else self._resolve(allowed)
+
+    def load(self, path):
+        """
+        Load allowed classes from a file
+
+        The file is either a JSON list or plain text with one class name or
+        id per line ('#' starts a comment).
+        """
+        self._mtime = os.path.getmtime(path)
+        with open(path) as f:
+            content = f.read()
+
+        if content.lstrip().startswith('['):
+            entries = json.loads(content)
+        else:
+            entries = [line.split('#', 1)[0].strip() for line in content.splitlines()]
+            entries = [entry for entry in entries if entry]
+
+        self.set_allowed(entries)
+        self.path = path
+
+    def maybe_reload(self):
+        """
+        Re-read the filter file if it changed since it was last loaded
+
+        Checks at most once per check_interval; a broken file keeps the
+        previous filter in place.
+        """
+        if self.path is None:
+            return
+        now = time.time()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self.load(self.path)
+                get_sink().emit(
+                    'class_filter.reload', "Class filter reloaded from {path} ({count} classes)",
+                    path=self.path, count=len(self.class_ids)
+                )
+        except (OSError, ValueError) as e:
+            get_sink().emit(
+                'class_filter.reload_failed', "[!] Class filter reload failed, keeping previous set: {error}",
+                level='warning', error=str(e)
+            )
@@ -0,0 +1,147 @@
+import numpy as np
+
+
+class Detections:
+    """
+    Columnar detection results for a single frame
+
+    Boxes, scores, class ids and prices are kept as NumPy arrays so a whole
+    frame can be filtered, priced or merged without per-box Python objects.
+    Iterating or indexing yields the legacy detection dictionaries lazily,
+    so older callers keep working unchanged.
+    """
+
+    def __init__(self, boxes=None, scores=None, class_ids=None, prices=None, class_names=None):
+        """
+        Args:
+            boxes: (N, 4) array of [x1, y1, x2, y2] in frame coordinates
+            scores: (N,) array of confidence scores
+            class_ids: (N,) array of integer class ids
+            prices: (N,) array of unit prices (defaults to 1.00 each)
+            class_names: Mapping of class id -> class name
+        """
+        if boxes is None:
+            boxes = np.zeros((0, 4), dtype=np.float32)
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+        n = len(self.boxes)
+        self.scores = np.zeros(n, dtype=np.float32) if scores is None else np.asarray(scores, dtype=np.float32).reshape(n)
+        self.class_ids = np.zeros(n, dtype=np.int32) if class_ids is None else np.asarray(class_ids, dtype=np.int32).reshape(n)
+        self.prices = np.ones(n, dtype=np.float64) if prices is None else np.asarray(prices, dtype=np.float64).reshape(n)
+        self.class_names = class_names if class_names is not None else {}
+
+    @classmethod
+    def empty(cls, class_names=None):
+        """
+        Create an empty result set
+        """
+        return cls(class_names=class_names)
+
+    @classmethod
+    def concatenate(cls, parts, class_names=None):
+        """
+        Stack several result sets into one
+
+        Args:
+            parts: Iterable of Detections
+            class_names: Class name mapping (defaults to the first part's)
+
+        Returns:
+            Combined Detections
+        """
+        parts = list(parts)
+        if class_names is None:
+            class_names = parts[0].class_names if parts else {}
+        if not parts:
+            return cls.empty(class_names)
+
+        return cls(
+            boxes=np.concatenate([p.boxes for p in parts]),
+            scores=np.concatenate([p.scores for p in parts]),
+            class_ids=np.concatenate([p.class_ids for p in parts]),
+            prices=np.concatenate([p.prices for p in parts]),
+            class_names=class_names
+        )
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __bool__(self):
+        return len(self.boxes) > 0
+
+    def __iter__(self):
+        for i in range(len(self.boxes)):
+            yield self._as_dict(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self.boxes)
+            if not 0 <= index < len(self.boxes):
+                raise IndexError("detection index out of range")
+            return self._as_dict(index)
+        return self.select(index)
+
+    def __repr__(self):
+        return f"Detections(n={len(self.boxes)})"
+
+    def name(self, index):
+        """
+        Get the class name of a single detection
+        """
+        class_id = int(self.class_ids[index])
+        return self.class_names.get(class_id, f"class_{class_id}")
+
+    @property
+    def names(self):
+        """
+        Class names for all detections (list of str)
+        """
+        return [self.name(i) for i in range(len(self.boxes))]
+
+    def _as_dict(self, index):
+        """
+        Build the legacy detection dictionary for one row
+        """
+        x1, y1, x2, y2 = self.boxes[index]
+        return {
+            'name': self.name(index),
+            'confidence': float(self.scores[index]),
+            'bbox': [int(x1), int(y1), int(x2), int(y2)],
+            'price': float(self.prices[index])
+        }
+
+    def to_dicts(self):
+        """
+        Materialize all detections as a list of dictionaries
+        """
+        return list(self)
+
+    def select(self, index):
+        """
+        Select a subset of detections
+
+        Args:
+            index: Boolean mask, integer index array or slice
+
+        Returns:
+            New Detections containing the selected rows
+        """
+        return Detections(
+            boxes=self.boxes[index],
+            scores=self.scores[index],
+            class_ids=self.class_ids[index],
+            prices=self.prices[index],
+            class_names=self.class_names
+        )
+
+    def offset(self, dx, dy):
+        """
+        Shift boxes by (dx, dy), e.g. to map crop coordinates back to the frame
+
+        Returns:
+            New Detections with translated boxes
+        """
+        shifted = self.select(slice(None))
+        shifted.boxes = self.boxes + np.array([dx, dy, dx, dy], dtype=np.float32)
+        return shifted
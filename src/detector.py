@@ -1,171 +1,326 @@
-from ultralytics import YOLO
-import cv2
+import time
+
 import numpy as np
 
+from src.backends import create_backend, resolve_backend
+from src.box_ops import nms
+from src.cascade import CascadeRescorer
+from src.class_filter import ClassFilter
+from src.detections import Detections
+from src.pricing import PriceCatalog
+from src.roi import tile_region
+
 
 class ProductDetector:
-    def __init__(self, model_path, conf_threshold=0.5):
+    # Input sizes must be multiples of the model stride
+    stride = 32
+    
+    def __init__(self, model_path, conf_threshold=0.5, backend='auto', scan_zones=None,
+                 merge_iou_threshold=0.5, tile_size=None, tile_overlap=0.2, tile_full_frame=True,
+                 adaptive_resolution=None, model_cache=None, cascade_model=None,
+                 cascade_band=(0.25, 0.6), allowed_classes=None):
         """
         Initialize YOLOv8 model for product detection
+        
+        Args:
+            model_path: Path to model weights (.pt for ultralytics, .onnx for ONNX Runtime)
+            conf_threshold: Minimum detection confidence
+            backend: Inference backend ('auto', 'ultralytics' or 'onnx')
+            scan_zones: Optional list of ScanZone; only these regions are
+                        sent to the model
+            merge_iou_threshold: IoU above which boxes from different
+                                 regions are treated as duplicates
+            tile_size: If set, split frames (or scan zones) larger than this
+                       into overlapping square tiles of this size
+            tile_overlap: Fraction of tile_size shared by neighbouring tiles
+            tile_full_frame: Also run the whole (downscaled) region alongside
+                             its tiles so items larger than a tile are kept
+            adaptive_resolution: Optional AdaptiveResolution controller that
+                                 picks the input size from measured latency
+            model_cache: Optional ModelCache; .pt weights are exported once
+                         (in the resolved backend's format) and later
+                         starts load the cached artifact
+            cascade_model: Optional path to a larger model; detections whose
+                           confidence falls in cascade_band are re-scored by it
+            cascade_band: (low, high) confidence band sent to the larger model
+            allowed_classes: Optional per-lane class restriction: an iterable
+                             of class names/ids, or a path to a filter file
+                             that is reloaded when it changes
         """
-        self.model = YOLO(model_path)
+        load_start = time.perf_counter()
+        self.cache_hit = None
+        if model_cache is not None and str(model_path).endswith('.pt'):
+            model_path, self.cache_hit = model_cache.prepare(
+                model_path, backend=resolve_backend(model_path, backend)
+            )
+            # The artifact's format decides the engine (.onnx -> ONNX Runtime)
+            backend = 'auto'
+        self.backend = create_backend(model_path, backend)
+        self.cascade = None
+        if cascade_model is not None:
+            low, high = cascade_band
+            self.cascade = CascadeRescorer(create_backend(cascade_model), low=low, high=high)
+        self.startup_times = {'load_s': time.perf_counter() - load_start}
         self.conf_threshold = conf_threshold
-        self.class_names = self.model.names
-        
-        # Product price mapping (comprehensive list for demo)
-        self.price_map = {
-            # Fruits
-            'apple': 0.50,
-            'banana': 0.30,
-            'orange': 0.40,
-            'grape': 0.35,
-            'mango': 0.75,
-            'strawberry': 0.60,
-            'blueberry': 0.80,
-            'watermelon': 3.50,
-            'pineapple': 1.50,
-            'lemon': 0.25,
-            
-            # Vegetables
-            'tomato': 0.60,
-            'potato': 0.40,
-            'onion': 0.35,
-            'carrot': 0.45,
-            'cucumber': 0.70,
-            'pepper': 0.90,
-            'lettuce': 1.00,
-            'broccoli': 1.20,
-            'spinach': 0.80,
-            'cabbage': 0.55,
-            
-            # Dairy
-            'milk': 1.50,
-            'yogurt': 1.80,
-            'cheese': 2.50,
-            'butter': 3.00,
-            'cream': 2.00,
-            'egg': 0.25,
-            'eggs': 2.50,
-            
-            # Bread & Bakery
-            'bread': 2.00,
-            'croissant': 1.50,
-            'donut': 0.75,
-            'cake': 3.00,
-            'muffin': 1.00,
-            
-            # Beverages
-            'water': 0.80,
-            'coffee': 5.00,
-            'tea': 3.50,
-            'juice': 2.00,
-            'cola': 1.50,
-            'soda': 1.50,
-            'milk_bottle': 1.50,
-            
-            # Snacks & Sweets
-            'chocolate': 1.20,
-            'candy': 0.50,
-            'chips': 1.00,
-            'cookie': 0.75,
-            'cereal': 4.00,
-            'granola': 3.50,
-            'popcorn': 2.50,
-            
-            # Pantry Items
-            'pasta': 1.80,
-            'rice': 3.00,
-            'flour': 2.50,
-            'sugar': 2.00,
-            'salt': 1.00,
-            'oil': 4.50,
-            'canned_beans': 1.20,
-            'canned_tuna': 1.80,
-            'peanut_butter': 3.00,
-            'jam': 2.50,
-            
-            # Condiments
-            'ketchup': 2.00,
-            'mustard': 1.50,
-            'mayo': 2.50,
-            'vinegar': 1.80,
-            'soy_sauce': 2.00,
-            
-            # Frozen Foods
-            'frozen_pizza': 5.00,
-            'frozen_vegetables': 3.50,
-            'ice_cream': 4.00,
-            'frozen_fish': 6.00,
-            'frozen_chicken': 5.50,
-            
-            # Household Items
-            'soap': 1.50,
-            'shampoo': 3.00,
-            'toothpaste': 2.00,
-            'detergent': 2.50,
-            'toilet_paper': 3.00,
-            'tissues': 1.00,
-            'paper_towels': 1.50,
-            
-            # Personal Care
-            'deodorant': 2.50,
-            'lotion': 3.00,
-            'sunscreen': 4.00,
+        self.scan_zones = list(scan_zones) if scan_zones else []
+        self.merge_iou_threshold = merge_iou_threshold
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_full_frame = tile_full_frame
+        self.adaptive_resolution = adaptive_resolution
+        self.class_names = self.backend.names
+        
+        # Compile the price table once against the model's classes
+        self.catalog = PriceCatalog(self.class_names)
+        
+        self.class_filter = None
+        if isinstance(allowed_classes, str):
+            self.class_filter = ClassFilter(self.class_names, path=allowed_classes)
+        elif allowed_classes is not None:
+            self.class_filter = ClassFilter(self.class_names, allowed=allowed_classes)
+        self.price_map = self.catalog.price_map
+        
+        missing = self.catalog.missing_skus()
+        if missing:
+            preview = ', '.join(missing[:5]) + (', ...' if len(missing) > 5 else '')
+            print(f"[!] {len(missing)} model classes have no catalog price "
+                  f"(charged ${self.catalog.default_price:.2f}): {preview}")
+    
+    def warmup(self, sizes=None, batch_size=1, runs=1):
+        """
+        Run dummy forward passes so the first real frames don't pay lazy
+        initialization cost (memory allocation, kernel selection, ...)
+        
+        Args:
+            sizes: Input sizes to warm up (default: the adaptive controller's
+                   sizes, or the model default)
+            batch_size: Frames per dummy batch
+            runs: Passes per size
             
-            # More generic items (for generalization)
-            'item': 1.00,
-            'product': 1.00,
-            'object': 1.00,
-        }
+        Returns:
+            Warmup time in seconds
+        """
+        if sizes is None:
+            sizes = self.adaptive_resolution.sizes if self.adaptive_resolution is not None else [None]
+        
+        start = time.perf_counter()
+        for size in sizes:
+            side = size or 640
+            frames = [np.full((side, side, 3), 114, dtype=np.uint8)] * batch_size
+            for _ in range(runs):
+                self.backend.infer(frames, self.conf_threshold, imgsz=size)
+        
+        if self.cascade is not None:
+            side = self.cascade.crop_imgsz
+            crops = [np.full((side, side, 3), 114, dtype=np.uint8)] * batch_size
+            for _ in range(runs):
+                self.cascade.backend.infer(crops, self.conf_threshold, imgsz=side)
+        
+        self.startup_times['warmup_s'] = time.perf_counter() - start
+        return self.startup_times['warmup_s']
     
     def detect(self, image):
         """
         Detect products in the image
+        
+        Returns:
+            Detections for the frame (iterable as detection dictionaries)
+        """
+        return self.detect_batch([image])[0]
+    
+    def detect_batch(self, frames):
+        """
+        Detect products in several frames with a single forward pass
+        
+        Args:
+            frames: List of images (BGR numpy arrays)
+            
+        Returns:
+            List with one Detections result per frame (iterating a
+            result yields the legacy detection dictionaries)
+        """
+        if len(frames) == 0:
+            return []
+        
+        if self.class_filter is not None:
+            self.class_filter.maybe_reload()
+        
+        start = time.perf_counter()
+        if self.scan_zones or self.tile_size:
+            results = self._detect_regions(frames)
+        else:
+            results = self._infer(frames)
+        
+        if self.cascade is not None:
+            results = self.cascade.refine(frames, results, self.conf_threshold, self._prices_for,
+                                          classes=self._allowed_class_ids())
+        
+        if self.adaptive_resolution is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.adaptive_resolution.record(elapsed_ms / len(frames))
+        
+        return results
+    
+    def set_allowed_classes(self, allowed_classes):
+        """
+        Hot-swap the per-lane class restriction
+        
+        Args:
+            allowed_classes: Iterable of class names/ids, or None to allow all
+        """
+        if self.class_filter is None:
+            self.class_filter = ClassFilter(self.class_names)
+        self.class_filter.set_allowed(allowed_classes)
+    
+    def _allowed_class_ids(self):
+        """
+        Current allowed class ids (None = all classes)
+        """
+        return self.class_filter.class_ids if self.class_filter is not None else None
+    
+    def set_scan_zones(self, scan_zones):
+        """
+        Replace the scan zones (empty list or None = full frame)
+        """
+        self.scan_zones = list(scan_zones) if scan_zones else []
+    
+    def _max_imgsz(self):
+        """
+        Input size for full frames: the adaptive controller's choice, or
+        the backend default
+        """
+        if self.adaptive_resolution is not None:
+            return self.adaptive_resolution.imgsz
+        return self.backend.default_imgsz
+    
+    def _region_imgsz(self, crop_shape):
+        """
+        Input size for a crop: its long side rounded up to the stride and
+        capped at the full-frame size, so small crops are not upscaled
+        """
+        long_side = max(crop_shape[:2])
+        return min(self._max_imgsz(), max(self.stride, -(-long_side // self.stride) * self.stride))
+    
+    def _infer(self, images, imgsz=None):
+        """
+        Run the backend on a batch of images and wrap the raw outputs
+        
+        Args:
+            images: List of BGR images
+            imgsz: Optional input size (default: the adaptive controller's
+                   size, or the backend default)
+        """
+        if imgsz is None and self.adaptive_resolution is not None:
+            imgsz = self.adaptive_resolution.imgsz
+        
+        # In cascade mode the small model must also report uncertain boxes
+        conf_threshold = self.conf_threshold
+        if self.cascade is not None:
+            conf_threshold = min(conf_threshold, self.cascade.low)
+        
+        # Run inference on the whole batch at once
+        outputs = self.backend.infer(list(images), conf_threshold, imgsz=imgsz,
+                                     classes=self._allowed_class_ids())
+        
+        return [
+            Detections(
+                boxes=boxes,
+                scores=scores,
+                class_ids=class_ids,
+                prices=self._prices_for(class_ids),
+                class_names=self.class_names
+            )
+            for boxes, scores, class_ids in outputs
+        ]
+    
+    def _regions_for(self, frame):
+        """
+        List the crops of one frame to send to the model
+        
+        Returns:
+            List of ((x1, y1, x2, y2), zone) pairs; zone is None when
+            detecting on the full frame
+        """
+        h, w = frame.shape[:2]
+        regions = []
+        for zone in self.scan_zones or [None]:
+            bounds = zone.bounds(frame.shape) if zone is not None else (0, 0, w, h)
+            x1, y1, x2, y2 = bounds
+            if x2 <= x1 or y2 <= y1:
+                continue
+            
+            crops = [bounds]
+            if self.tile_size:
+                crops = tile_region(bounds, self.tile_size, self.tile_overlap)
+                if len(crops) > 1 and self.tile_full_frame:
+                    crops.append(bounds)
+            regions.extend((crop, zone) for crop in crops)
+        return regions
+    
+    def _detect_regions(self, frames):
+        """
+        Detect on scan zones and/or tiles of each frame
+        
+        Crops of all frames are batched by input size (each crop runs at its
+        own size, not upscaled to the full model input); boxes are mapped
+        back to full-frame coordinates and duplicates across crops are
+        merged.
+        """
+        crops = []
+        owners = []
+        for frame_index, frame in enumerate(frames):
+            for (x1, y1, x2, y2), zone in self._regions_for(frame):
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((frame_index, zone, x1, y1))
+        
+        batches = {}
+        for index, crop in enumerate(crops):
+            batches.setdefault(self._region_imgsz(crop.shape), []).append(index)
+        region_detections = [None] * len(crops)
+        for imgsz, indices in batches.items():
+            outputs = self._infer([crops[index] for index in indices], imgsz=imgsz)
+            for index, detections in zip(indices, outputs):
+                region_detections[index] = detections
+        
+        parts = [[] for _ in frames]
+        for (frame_index, zone, x1, y1), detections in zip(owners, region_detections):
+            detections = detections.offset(x1, y1)
+            if zone is not None and not zone.is_rect:
+                detections = detections.select(zone.contains_boxes(detections.boxes))
+            parts[frame_index].append(detections)
+        
+        return [self._merge(frame_parts) for frame_parts in parts]
+    
+    def _merge(self, parts):
+        """
+        Combine per-crop detections of one frame, removing duplicates
+        where crops overlap
+        
+        With tiling, overlap is measured as intersection over the smaller
+        box, so a partial box cut at a tile seam is merged into the full one.
+        """
+        merged = Detections.concatenate(parts, self.class_names)
+        if len(parts) > 1 and len(merged) > 1:
+            metric = 'ios' if self.tile_size else 'iou'
+            keep = nms(merged.boxes, merged.scores, self.merge_iou_threshold, merged.class_ids,
+                       metric=metric)
+            merged = merged.select(keep)
+        return merged
+    
+    def _prices_for(self, class_ids):
+        """
+        Look up unit prices for an array of class ids
         """
-        # Run YOLOv8 inference
-        results = self.model(image, conf=self.conf_threshold, verbose=False)
-        
-        detections = []
-        
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    try:
-                        # Extract detection information
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0])
-                        class_id = int(box.cls[0])
-                        
-                        # Get class name
-                        class_name = self.class_names.get(class_id, f"class_{class_id}")
-                        
-                        # Get price
-                        price = self.price_map.get(class_name.lower(), 1.00)
-                        
-                        # Create detection dictionary
-                        detection = {
-                            'name': class_name,
-                            'confidence': confidence,
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'price': price
-                        }
-                        
-                        detections.append(detection)
-                    except Exception as e:
-                        print(f"Error processing detection: {e}")
-                        continue
-        
-        return detections
+        return self.catalog.prices_for(class_ids)
     
     def get_price(self, product_name):
         """
         Get price for a product
         """
-        return self.price_map.get(product_name.lower(), 1.00)
+        return self.catalog.get(product_name)
     
     def update_price(self, product_name, price):
         """
         Update price for a product
         """
-        self.price_map[product_name.lower()] = price
+        self.catalog.update(product_name, price)
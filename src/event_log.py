@@ -0,0 +1,211 @@
+import json
+from datetime import datetime
+
+import numpy as np
+
+
+EVENT_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('item_id', 'i4'),
+    ('price', 'f8'),
+    ('confidence', 'f8'),
+    ('bbox', 'i4', (4,)),
+    ('has_bbox', '?'),
+])
+
+
+class EventLog:
+    """
+    Compact, bounded store for cart add events
+
+    Events live in a NumPy structured array (~45 bytes each) that grows up
+    to a fixed capacity, with item names interned to small integer ids. Timestamps stay floats
+    and are only formatted when exported. When the buffer is full, the
+    oldest half is either spilled to an NDJSON file or dropped, so memory
+    stays flat however long the session runs.
+    """
+
+    def __init__(self, capacity=10000, spill_path=None):
+        """
+        Args:
+            capacity: Maximum number of events kept in memory
+            spill_path: Optional NDJSON file that receives the oldest events
+                        when the buffer is full (default: drop them)
+        """
+        if capacity < 2:
+            raise ValueError(f"Event log capacity must be at least 2, got {capacity}")
+        self.capacity = capacity
+        self.spill_path = spill_path
+
+        self._events = np.zeros(min(capacity, 64), dtype=EVENT_DTYPE)
+        self._count = 0
+        self._item_names = []
+        self._item_ids = {}
+
+        self.spilled = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._count
+
+    def _intern(self, name):
+        item_id = self._item_ids.get(name)
+        if item_id is None:
+            item_id = len(self._item_names)
+            self._item_ids[name] = item_id
+            self._item_names.append(name)
+        return item_id
+
+    def _make_room(self, needed):
+        """
+        Spill or drop the oldest events until `needed` slots are free
+        """
+        if len(self._events) - self._count >= needed:
+            return
+        if len(self._events) < self.capacity:
+            size = min(self.capacity, max(2 * len(self._events), self._count + needed))
+            grown = np.zeros(size, dtype=EVENT_DTYPE)
+            grown[:self._count] = self._events[:self._count]
+            self._events = grown
+            if size - self._count >= needed:
+                return
+
+        free = self.capacity - self._count
+        # Release half the buffer at a time so the cost is amortized
+        release = min(self._count, max(needed - free, self.capacity // 2))
+        oldest = self._events[:release]
+        if self.spill_path is not None:
+            with open(self.spill_path, 'a') as f:
+                f.writelines(json.dumps(record) + '\n' for record in self._records(oldest))
+            self.spilled += release
+        else:
+            self.dropped += release
+
+        remaining = self._count - release
+        self._events[:remaining] = self._events[release:self._count]
+        self._count = remaining
+
+    def extend(self, timestamp, events):
+        """
+        Append events that share one timestamp
+
+        Args:
+            timestamp: Seconds since epoch
+            events: List of (name, confidence, bbox, price) tuples; bbox
+                    may be None
+        """
+        count = len(events)
+        if count == 0:
+            return
+        if count > self.capacity:
+            # Only the newest events can fit
+            self.dropped += count - self.capacity
+            events = events[-self.capacity:]
+            count = self.capacity
+        self._make_room(count)
+
+        rows = self._events[self._count:self._count + count]
+        rows['timestamp'] = timestamp
+        rows['item_id'] = [self._intern(name) for name, _, _, _ in events]
+        rows['confidence'] = [confidence for _, confidence, _, _ in events]
+        rows['price'] = [price for _, _, _, price in events]
+        has_bbox = [bbox is not None for _, _, bbox, _ in events]
+        rows['has_bbox'] = has_bbox
+        rows['bbox'] = [bbox if bbox is not None else (-1, -1, -1, -1) for _, _, bbox, _ in events]
+        self._count += count
+
+    def clear(self):
+        """
+        Forget the in-memory events (spilled events stay on disk)
+        """
+        self._count = 0
+
+    def _records(self, events, session_id=None):
+        """
+        Format structured events as history dictionaries
+        """
+        names = self._item_names
+        for timestamp, item_id, price, confidence, bbox, has_bbox in zip(
+            events['timestamp'].tolist(),
+            events['item_id'].tolist(),
+            events['price'].tolist(),
+            events['confidence'].tolist(),
+            events['bbox'].tolist(),
+            events['has_bbox'].tolist()
+        ):
+            yield {
+                'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
+                'item': names[item_id],
+                'price': price,
+                'confidence': confidence,
+                'session_id': session_id,
+                'bbox': bbox if has_bbox else None
+            }
+
+    def iter_records(self, session_id=None, include_spilled=True):
+        """
+        Iterate over events as history dictionaries, oldest first
+
+        Args:
+            session_id: Session id added to each record
+            include_spilled: Also read back events spilled to disk
+
+        Yields:
+            Dictionaries in the cart_history format
+        """
+        if include_spilled and self.spilled and self.spill_path is not None:
+            with open(self.spill_path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    record['session_id'] = session_id
+                    yield record
+        yield from self._records(self._events[:self._count], session_id)
+
+    def export_raw(self):
+        """
+        In-memory events as JSON-friendly lists, for snapshots
+
+        Returns:
+            List of [timestamp, name, confidence, bbox or None, price]
+        """
+        events = self._events[:self._count]
+        names = self._item_names
+        return [
+            [timestamp, names[item_id], confidence, bbox if has_bbox else None, price]
+            for timestamp, item_id, confidence, bbox, has_bbox, price in zip(
+                events['timestamp'].tolist(),
+                events['item_id'].tolist(),
+                events['confidence'].tolist(),
+                events['bbox'].tolist(),
+                events['has_bbox'].tolist(),
+                events['price'].tolist()
+            )
+        ]
+
+    def import_raw(self, rows):
+        """
+        Append events produced by export_raw
+        """
+        for timestamp, name, confidence, bbox, price in rows:
+            self.extend(timestamp, [(name, confidence, bbox, price)])
+
+    def to_dicts(self, session_id=None, include_spilled=True):
+        """
+        Export events as a list of history dictionaries
+        """
+        return list(self.iter_records(session_id, include_spilled))
+
+    def get_stats(self):
+        """
+        Get event log counters
+
+        Returns:
+            Dictionary with events in memory, spilled and dropped
+        """
+        return {
+            'in_memory': self._count,
+            'capacity': self.capacity,
+            'spilled': self.spilled,
+            'dropped': self.dropped,
+            'memory_bytes': self._events.nbytes
+        }
@@ -0,0 +1,238 @@
+import atexit
+import collections
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+
+LEVELS = {
+    'debug': 10,
+    'info': 20,
+    'warning': 30,
+    'error': 40,
+}
+
+_STOP = object()
+
+
+class StdoutOutput:
+    """
+    Print event messages to a text stream (stdout by default)
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, record):
+        stream = self.stream or sys.stdout
+        stream.write(record['message'] + '\n')
+
+    def flush(self):
+        (self.stream or sys.stdout).flush()
+
+    def close(self):
+        self.flush()
+
+
+class RotatingFileOutput:
+    """
+    Append events as JSON lines to a file, rotating it by size
+
+    path is renamed to path.1 (path.1 to path.2, ...) once it exceeds
+    max_bytes; at most `backups` old files are kept.
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a')
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'a')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, default=str) + '\n')
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class RingOutput:
+    """
+    Keep the most recent events in memory (e.g. for a status screen or a
+    crash report)
+    """
+
+    def __init__(self, capacity=1000):
+        self.records = collections.deque(maxlen=capacity)
+
+    def write(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class EventSink:
+    """
+    Asynchronous structured event logger
+
+    emit() only filters by level and puts a tuple on a bounded queue; a
+    background thread formats the message and hands the record to every
+    output. A slow terminal or disk therefore never blocks the frame loop.
+    When the queue is full, events are either dropped (counted) or the
+    caller waits, depending on the policy.
+    """
+
+    def __init__(self, outputs=None, level='info', max_queue=10000, policy='drop'):
+        """
+        Args:
+            outputs: List of outputs (default: [StdoutOutput()])
+            level: Minimum level that is recorded ('debug', 'info',
+                   'warning', 'error')
+            max_queue: Maximum events waiting to be written
+            policy: 'drop' (discard events when the queue is full) or
+                    'block' (wait for room)
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}' (choose from: {', '.join(LEVELS)})")
+        if policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown queue policy '{policy}' (choose 'drop' or 'block')")
+        self.outputs = outputs if outputs is not None else [StdoutOutput()]
+        self.level = LEVELS[level]
+        self.policy = policy
+        self.dropped = 0
+
+        self._queue = queue.Queue(max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name='event-sink', daemon=True)
+        self._thread.start()
+
+    def emit(self, event, message, level='info', **fields):
+        """
+        Record an event
+
+        Args:
+            event: Event name (e.g. 'cart.add')
+            message: Human-readable message; str.format template filled
+                     with fields on the writer thread
+            level: Event level
+            **fields: Structured event data
+        """
+        if LEVELS[level] < self.level or self._closed:
+            return
+        item = (time.time(), level, event, message, fields)
+        if self.policy == 'block':
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                timestamp, level, event, message, fields = item
+                record = {
+                    'ts': timestamp,
+                    'level': level,
+                    'event': event,
+                    'message': self._format(event, message, fields)
+                }
+                record.update(fields)
+                for output in self.outputs:
+                    try:
+                        output.write(record)
+                    except Exception as e:
+                        # A broken output must not stop the others
+                        sys.stderr.write(f"[!] Event output failed: {e}\n")
+                if self._queue.empty():
+                    for output in self.outputs:
+                        output.flush()
+            finally:
+                self._queue.task_done()
+
+    def _format(self, event, message, fields):
+        """
+        Fill the message template; a bad template must not stop the writer
+        thread, so it falls back to the raw template and fields
+        """
+        if not fields:
+            return message
+        try:
+            return message.format(**fields)
+        except Exception as e:
+            sys.stderr.write(f"[!] Bad message template for event '{event}': {e!r}\n")
+            return f"{message} {fields}"
+
+    def flush(self):
+        """
+        Wait until every queued event has been written
+        """
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """
+        Write the remaining events, stop the writer thread and close outputs
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        for output in self.outputs:
+            output.close()
+
+
+_default_sink = None
+
+
+def get_sink():
+    """
+    Process-wide default sink (stdout), created on first use and closed at
+    interpreter exit so pending events are not lost
+    """
+    global _default_sink
+    if _default_sink is None:
+        set_sink(EventSink())
+    return _default_sink
+
+
+def set_sink(sink):
+    """
+    Replace the process-wide default sink
+    """
+    global _default_sink
+    previous = _default_sink
+    _default_sink = sink
+    if previous is not None and previous is not sink:
+        previous.close()
+    atexit.register(sink.close)
@@ -2,40 +2,176 @@ import cv2
 import argparse
 from src.detector import ProductDetector
 from src.cart_manager import CartManager
+from src.cart_journal import recover_cart
 from src.visualizer import Visualizer
+from src.motion import MotionGate
+from src.roi import load_scan_zones
+from src.adaptive import AdaptiveResolution
+from src.model_cache import ModelCache
+from src.tracker import IoUTracker
+from src.pipeline import Pipeline
+from src.video_writer import AsyncVideoWriter
+from src.event_sink import EventSink, RotatingFileOutput, StdoutOutput, get_sink, set_sink
+import threading
 import time
 
 
 class FastBillingXCheckout:
-    def __init__(self, model_path='models/best.pt', conf_threshold=0.5):
+    def __init__(self, model_path='models/best.pt', conf_threshold=0.5, backend='auto',
+                 motion_gate=None, scan_zones=None, tile_size=None, tile_overlap=0.2,
+                 adaptive_resolution=None, model_cache=None, warmup=True, cascade_model=None,
+                 cascade_band=(0.25, 0.6), allowed_classes=None, use_tracking=True,
+                 journal_path=None):
         """
         Initialize the computer vision checkout system
+        
+        Args:
+            model_path: Path to model weights
+            conf_threshold: Minimum detection confidence
+            backend: Inference backend ('auto', 'ultralytics' or 'onnx')
+            motion_gate: Optional MotionGate; static frames reuse the last
+                         detections instead of running the model
+            scan_zones: Optional list of ScanZone to restrict detection to
+            tile_size: Tile side for tiled detection on high-resolution frames
+            tile_overlap: Fraction of overlap between neighbouring tiles
+            adaptive_resolution: Optional AdaptiveResolution controller to
+                                 keep inference within a latency budget
+            model_cache: Optional ModelCache for prepared model artifacts
+            warmup: Run dummy forward passes before the first frame
+            cascade_model: Optional larger model that re-scores uncertain boxes
+            cascade_band: (low, high) confidence band re-scored by cascade_model
+            allowed_classes: Per-lane class names/ids, or a path to a
+                             hot-reloaded class filter file
+            use_tracking: Deduplicate cart additions with an IoU tracker
+                          (one commit per physical item) instead of the
+                          cart's per-name cooldown
+            journal_path: Optional cart journal file; the cart is recovered
+                          from it on start and every change is appended
         """
-        self.detector = ProductDetector(model_path, conf_threshold)
-        self.cart_manager = CartManager()
+        init_start = time.time()
+        self.detector = ProductDetector(model_path, conf_threshold, backend=backend,
+                                        scan_zones=scan_zones, tile_size=tile_size,
+                                        tile_overlap=tile_overlap,
+                                        adaptive_resolution=adaptive_resolution,
+                                        model_cache=model_cache,
+                                        cascade_model=cascade_model,
+                                        cascade_band=cascade_band,
+                                        allowed_classes=allowed_classes)
+        if warmup:
+            self.detector.warmup()
+        self._report_startup(time.time() - init_start, model_cache)
+        self.motion_gate = motion_gate
+        self.last_detections = None
+        self.tracker = IoUTracker() if use_tracking else None
+        dedup_cooldown = 0 if use_tracking else 2.0
+        if journal_path:
+            self.cart_manager = recover_cart(journal_path, dedup_cooldown=dedup_cooldown)
+        else:
+            self.cart_manager = CartManager(dedup_cooldown=dedup_cooldown)
+        # Guards cart and tracker when inference and key handling run on
+        # different threads (pipelined mode)
+        self.cart_lock = threading.Lock()
         self.visualizer = Visualizer()
+        self.pipeline = None
+        self.headless = False
+        self.render_interval = 0.0
+        self.render_step = 1
+        self.last_render = 0.0
+        self.frames_presented = 0
+        self.frames_rendered = 0
         self.frame_count = 0
         self.fps = 0
         self.start_time = time.time()
         
+    def _report_startup(self, total_s, model_cache=None):
+        """
+        Print (and log to the model cache, if any) startup timings
+        """
+        times = dict(self.detector.startup_times, total_s=total_s)
+        if self.detector.cache_hit is None:
+            start_kind = 'no model cache'
+        else:
+            start_kind = 'warm start (cache hit)' if self.detector.cache_hit else 'cold start (cache miss)'
+        times['start'] = start_kind
+        self.startup_times = times
+        
+        print(f"Model ready in {total_s:.2f}s - {start_kind}: "
+              f"load {times['load_s']:.2f}s, warmup {times.get('warmup_s', 0):.2f}s")
+        if model_cache is not None:
+            model_cache.record_startup(times)
+    
     def process_frame(self, frame):
         """
         Process a single frame for product detection
         """
-        # Detect products in frame
-        detections = self.detector.detect(frame)
+        return self.process_batch([frame])[0]
+    
+    def process_batch(self, frames):
+        """
+        Process several frames with one batched detector call
         
-        # Update cart with detected items
-        for detection in detections:
-            self.cart_manager.add_item(
-                name=detection['name'],
-                confidence=detection['confidence'],
-                bbox=detection['bbox'],
-                price=detection.get('price', 1.00)
-            )
+        Frames the motion gate marks as static are not sent to the model;
+        they reuse the most recent detections.
+        
+        Args:
+            frames: List of frames in capture order
+            
+        Returns:
+            List of (processed_frame, cart_items) tuples, one per frame
+        """
+        return [self._draw(*result) for result in self.infer_batch(frames)]
+    
+    def infer_batch(self, frames):
+        """
+        Detect and update the cart for a batch of frames, without drawing
+        
+        Returns:
+            List of (frame, detections, cart_state) tuples for _draw
+        """
+        needs_detection = [self._needs_detection(frame) for frame in frames]
+        batch_detections = iter(self.detector.detect_batch(
+            [frame for frame, needed in zip(frames, needs_detection) if needed]
+        ))
+        
+        results = []
+        for frame, needed in zip(frames, needs_detection):
+            if needed:
+                self.last_detections = next(batch_detections)
+            results.append((frame, self.last_detections, self._update_cart(self.last_detections)))
+        return results
+    
+    def _needs_detection(self, frame):
+        """
+        Ask the motion gate (if any) whether this frame must be detected
+        """
+        if self.motion_gate is None:
+            return True
+        moved = self.motion_gate.update(frame)
+        return moved or self.last_detections is None
+    
+    def _update_cart(self, detections):
+        """
+        Commit one frame's detections to the cart
         
-        # Get current cart state
-        cart_items = self.cart_manager.get_cart_summary()
+        Returns:
+            (cart_items, total, item_count, version) as of this frame
+        """
+        with self.cart_lock:
+            # Only newly confirmed tracks reach the cart when tracking is on
+            if self.tracker is not None:
+                new_items = detections.select(self.tracker.update(detections))
+            else:
+                new_items = detections
+            
+            # Update cart with the whole frame's detections at once
+            if len(new_items):
+                self.cart_manager.add_items(new_items, timestamp=time.time())
+            
+            # Get current cart state
+            cart_items = self.cart_manager.get_cart_summary()
+            total = self.cart_manager.get_total()
+            item_count = self.cart_manager.get_item_count()
+            version = self.cart_manager.version
         
         # Calculate FPS
         self.frame_count += 1
@@ -43,16 +179,182 @@ class FastBillingXCheckout:
             elapsed = time.time() - self.start_time
             self.fps = self.frame_count / elapsed
         
+        return cart_items, total, item_count, version
+    
+    def _draw(self, frame, detections, cart_state):
+        """
+        Draw scan zones, detections and the cart overlay on a frame
+        
+        Returns:
+            (processed_frame, cart_items)
+        """
+        cart_items, total, item_count, version = cart_state
+        
         # Draw visualizations
+        if self.detector.scan_zones:
+            frame = self.visualizer.draw_scan_zones(frame, self.detector.scan_zones)
         frame = self.visualizer.draw_detections(frame, detections)
-        frame = self.visualizer.draw_cart_overlay(frame, cart_items, self.fps)
+        frame = self.visualizer.draw_cart_overlay(frame, cart_items, self.fps, total=total,
+                                                  item_count=item_count, cart_version=version)
         
         return frame, cart_items
     
-    def run(self, source=0, output_file=None):
+    def get_performance_stats(self):
+        """
+        Snapshot of runtime performance counters (for logging/charting)
+        
+        Returns:
+            Dictionary with FPS, frame count and optional gate/controller state
+        """
+        stats = {
+            'fps': self.fps,
+            'frames': self.frame_count
+        }
+        if self.motion_gate is not None:
+            stats['motion_gate'] = self.motion_gate.get_stats()
+        if self.tracker is not None:
+            stats['tracker'] = self.tracker.get_stats()
+        if self.detector.cascade is not None:
+            stats['cascade'] = self.detector.cascade.get_stats()
+        if self.detector.adaptive_resolution is not None:
+            stats['adaptive_resolution'] = self.detector.adaptive_resolution.get_state()
+        return stats
+    
+    def _should_render(self, out=None):
+        """
+        Decide whether this frame gets overlays drawn
+        
+        Nothing is drawn when no one consumes frames (headless without a
+        recorder); otherwise drawing is limited to the render rate. Files
+        are throttled by frame index (every render_step-th frame, so the
+        recording keeps the source's timing however fast frames are
+        processed); live sources by wall-clock time.
+        """
+        index = self.frames_presented
+        self.frames_presented += 1
+        if self.headless and out is None:
+            return False
+        if self.render_step > 1:
+            return index % self.render_step == 0
+        now = time.monotonic()
+        if now - self.last_render < self.render_interval:
+            return False
+        self.last_render = now
+        return True
+    
+    def _render(self, result, out=None):
+        """
+        Draw (if due) and present one infer_batch result
+        
+        Returns:
+            False when the user asked to quit
+        """
+        frame = None
+        if self._should_render(out):
+            frame = self._draw(*result)[0]
+            self.frames_rendered += 1
+        return self._present(frame, out)
+    
+    def _present(self, frame, out=None):
+        """
+        Show a processed frame, write it and handle keyboard input
+        
+        Args:
+            frame: Annotated frame, or None when this frame was not rendered
+            out: Optional video writer
+            
+        Returns:
+            False when the user asked to quit
+        """
+        if frame is not None:
+            # Display frame
+            if not self.headless:
+                cv2.imshow('FastBillingX - AI Checkout', frame)
+            
+            # Write to output file if specified
+            if out is not None:
+                out.write(frame)
+        
+        if self.headless:
+            # No window, no keyboard: stop with Ctrl+C
+            return True
+        
+        # Handle keyboard input
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            return False
+        elif key == ord('c'):
+            with self.cart_lock:
+                self.cart_manager.clear_cart()
+                if self.tracker is not None:
+                    self.tracker.reset()
+            print("Cart cleared!")
+        elif key == ord('s'):
+            with self.cart_lock:
+                self.cart_manager.save_cart_to_file()
+            print("Cart saved to file!")
+        return True
+    
+    def _run_loop(self, cap, out, batch_size, pipelined, queue_size, live):
+        """
+        Read, process and present frames until the source ends or the user quits
+        """
+        if pipelined:
+            def read_frame():
+                ret, frame = cap.read()
+                return frame if ret else None
+            
+            self.pipeline = Pipeline(
+                read_frame,
+                self.infer_batch,
+                lambda result: self._render(result, out),
+                batch_size=batch_size,
+                queue_size=queue_size,
+                drop_frames=live
+            )
+            self.pipeline.run()
+        else:
+            running = True
+            while running:
+                # Collect up to batch_size frames
+                frames = []
+                while len(frames) < batch_size:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    frames.append(frame)
+                
+                if not frames:
+                    break
+                
+                # Process frames; overlays are drawn only for rendered frames
+                for result in self.infer_batch(frames):
+                    if not self._render(result, out):
+                        running = False
+                        break
+    
+    def run(self, source=0, output_file=None, batch_size=1, pipelined=False, queue_size=2,
+            headless=False, render_fps=None):
         """
         Main loop for video processing
+        
+        Args:
+            source: Camera index or video file path
+            output_file: Output video file path (optional)
+            batch_size: Frames to read before each batched detector call
+                        (values > 1 suit offline video processing)
+            pipelined: Run capture, inference and rendering on separate
+                       threads (see src/pipeline.py)
+            queue_size: Capacity of the pipeline's inter-stage queues
+            headless: No display window or keyboard handling; frames are
+                      only drawn when output_file records them
+            render_fps: Maximum rate at which overlays are drawn, shown and
+                        recorded (default: every processed frame); video
+                        files render every round(source fps / render_fps)-th
+                        frame
         """
+        self.headless = headless
+        
         # Initialize video capture
         cap = cv2.VideoCapture(source)
         if not cap.isOpened():
@@ -63,45 +365,55 @@ class FastBillingXCheckout:
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         
-        # Initialize video writer if output file specified
+        # Live sources drop stale frames; files keep every frame
+        live = isinstance(source, int) or '://' in str(source)
+        
+        # Render rate: live sources by wall clock, files by frame index
+        self.render_interval = 0.0
+        self.render_step = 1
+        self.frames_presented = 0
+        if live:
+            self.render_interval = 1.0 / render_fps if render_fps else 0.0
+            record_fps = render_fps or 30.0
+        else:
+            source_fps = cap.get(cv2.CAP_PROP_FPS)
+            if not source_fps > 0:
+                source_fps = 30.0
+            if render_fps:
+                self.render_step = max(1, round(source_fps / render_fps))
+            record_fps = source_fps / self.render_step
+        
+        # Initialize video writer if output file specified (encodes on its
+        # own thread; a live lane skips frames rather than slowing down)
+        out = None
         if output_file:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_file, fourcc, 30.0, (width, height))
+            out = AsyncVideoWriter(output_file, 'mp4v', record_fps, (width, height),
+                                   policy='drop' if live else 'block')
         
         print("Starting FastBillingX Checkout System...")
-        print("Press 'q' to quit, 'c' to clear cart, 's' to save cart")
+        if headless:
+            print("Running headless - press Ctrl+C to stop")
+        else:
+            print("Press 'q' to quit, 'c' to clear cart, 's' to save cart")
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Process frame
-            processed_frame, cart_items = self.process_frame(frame)
-            
-            # Display frame
-            cv2.imshow('FastBillingX - AI Checkout', processed_frame)
-            
-            # Write to output file if specified
-            if output_file:
-                out.write(processed_frame)
-            
-            # Handle keyboard input
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('c'):
-                self.cart_manager.clear_cart()
-                print("Cart cleared!")
-            elif key == ord('s'):
-                self.cart_manager.save_cart_to_file()
-                print("Cart saved to file!")
+        try:
+            self._run_loop(cap, out, batch_size, pipelined, queue_size, live)
+        except KeyboardInterrupt:
+            print("\nInterrupted, shutting down...")
         
         # Cleanup
         cap.release()
-        if output_file:
+        if out is not None:
             out.release()
-        cv2.destroyAllWindows()
+            stats = out.get_stats()
+            print(f"Recorded {stats['frames_written']} frames to {output_file} "
+                  f"({stats['frames_dropped']} dropped)")
+        if not headless:
+            cv2.destroyAllWindows()
+        if self.cart_manager.journal is not None:
+            self.cart_manager.journal.close()
+        # Let queued cart events reach the console before the summary
+        get_sink().flush()
         
         # Print final cart summary
         print("\n" + "="*50)
@@ -116,6 +428,22 @@ class FastBillingXCheckout:
         print("-"*50)
         print(f"TOTAL: ${total:.2f}")
         print("="*50)
+        
+        if self.motion_gate is not None:
+            stats = self.motion_gate.get_stats()
+            print(f"Motion gate: skipped {stats['frames_skipped']}/{stats['frames_seen']} "
+                  f"frames ({stats['skip_ratio']:.0%})")
+        
+        if self.detector.adaptive_resolution is not None:
+            state = self.detector.adaptive_resolution.get_state()
+            print(f"Adaptive resolution: imgsz {state['imgsz']} "
+                  f"(avg {state['avg_latency_ms']:.1f} ms / budget {state['budget_ms']:.1f} ms, "
+                  f"{state['switches']} switches)")
+        
+        if self.pipeline is not None:
+            print(self.pipeline.format_stats())
+        if self.render_interval or self.render_step > 1 or headless:
+            print(f"Rendered {self.frames_rendered}/{self.frame_count} frames")
 
 
 def main():
@@ -123,24 +451,98 @@ def main():
     parser.add_argument('--source', type=str, default='0', 
                        help='Video source (0 for webcam, or path to video file)')
     parser.add_argument('--model', type=str, default='models/best.pt',
-                       help='Path to YOLOv8 model weights')
+                       help='Path to YOLOv8 model weights (.pt or exported .onnx)')
+    parser.add_argument('--backend', type=str, default='auto',
+                       choices=['auto', 'ultralytics', 'onnx'],
+                       help='Inference backend (auto picks onnx for .onnx files)')
     parser.add_argument('--conf', type=float, default=0.5,
                        help='Confidence threshold for detection')
     parser.add_argument('--output', type=str, default=None,
                        help='Output video file path (optional)')
+    parser.add_argument('--motion-gate', action='store_true',
+                       help='Skip detection on frames with no significant motion')
+    parser.add_argument('--motion-threshold', type=float, default=0.01,
+                       help='Fraction of changed pixels that counts as motion (default: 0.01)')
+    parser.add_argument('--roi-config', type=str, default=None,
+                       help='JSON file with per-camera scan zones (rects/polygons)')
+    parser.add_argument('--camera', type=str, default='default',
+                       help='Camera id to read from --roi-config (default: default)')
+    parser.add_argument('--tile-size', type=int, default=None,
+                       help='Enable tiled detection with square tiles of this size (e.g. 640 for 4K)')
+    parser.add_argument('--tile-overlap', type=float, default=0.2,
+                       help='Overlap fraction between neighbouring tiles (default: 0.2)')
+    parser.add_argument('--latency-budget', type=float, default=None,
+                       help='Per-frame inference budget in ms; adapts input size to stay within it')
+    parser.add_argument('--imgsz-options', type=str, default='320,416,512,640',
+                       help='Comma-separated input sizes the latency controller may use')
+    parser.add_argument('--model-cache', type=str, default=None, metavar='DIR',
+                       help='Cache exported model artifacts in DIR for fast restarts')
+    parser.add_argument('--no-warmup', action='store_true',
+                       help='Skip dummy warmup inference at startup')
+    parser.add_argument('--cascade-model', type=str, default=None,
+                       help='Larger model (e.g. yolov8l) that re-scores uncertain detections')
+    parser.add_argument('--cascade-band', type=str, default='0.25,0.6',
+                       help='Confidence band "low,high" re-scored by --cascade-model (default: 0.25,0.6)')
+    parser.add_argument('--allowed-classes', type=str, default=None, metavar='FILE',
+                       help='File listing the classes this lane may detect (reloaded on change)')
+    parser.add_argument('--no-tracking', action='store_true',
+                       help='Use the per-name cooldown instead of IoU tracking for cart dedup')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Frames per batched inference call (e.g. 4-8 for video files)')
+    parser.add_argument('--pipelined', action='store_true',
+                       help='Run capture, inference and display on separate threads (drops stale frames on live sources)')
+    parser.add_argument('--headless', action='store_true',
+                       help='No display window; overlays are only drawn when --output records them')
+    parser.add_argument('--render-fps', type=float, default=None,
+                       help='Maximum rate for drawing/showing/recording overlays (default: every frame)')
+    parser.add_argument('--journal', type=str, default=None, metavar='FILE',
+                       help='Cart journal for crash recovery (resumes the cart if it exists)')
+    parser.add_argument('--event-log', type=str, default=None, metavar='FILE',
+                       help='Also write cart/detector events as JSON lines to FILE (rotated at 10 MB)')
+    parser.add_argument('--log-level', type=str, default='info',
+                       choices=['debug', 'info', 'warning', 'error'],
+                       help='Minimum level of logged events')
     
     args = parser.parse_args()
     
+    outputs = [StdoutOutput()]
+    if args.event_log:
+        outputs.append(RotatingFileOutput(args.event_log))
+    set_sink(EventSink(outputs, level=args.log_level))
+    
+    scan_zones = load_scan_zones(args.roi_config, args.camera) if args.roi_config else None
+    adaptive_resolution = None
+    if args.latency_budget:
+        sizes = [int(size) for size in args.imgsz_options.split(',')]
+        adaptive_resolution = AdaptiveResolution(args.latency_budget, sizes)
+    
     # Initialize checkout system
     checkout = FastBillingXCheckout(
         model_path=args.model,
-        conf_threshold=args.conf
+        conf_threshold=args.conf,
+        backend=args.backend,
+        motion_gate=MotionGate(min_changed_fraction=args.motion_threshold) if args.motion_gate else None,
+        scan_zones=scan_zones,
+        tile_size=args.tile_size,
+        tile_overlap=args.tile_overlap,
+        adaptive_resolution=adaptive_resolution,
+        model_cache=ModelCache(args.model_cache) if args.model_cache else None,
+        warmup=not args.no_warmup,
+        cascade_model=args.cascade_model,
+        cascade_band=tuple(float(value) for value in args.cascade_band.split(',')),
+        allowed_classes=args.allowed_classes,
+        use_tracking=not args.no_tracking,
+        journal_path=args.journal
     )
     
     # Run the system
     checkout.run(
         source=args.source if args.source != '0' else 0,
-        output_file=args.output
+        output_file=args.output,
+        batch_size=max(1, args.batch_size),
+        pipelined=args.pipelined,
+        headless=args.headless,
+        render_fps=args.render_fps
     )
 
 
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'fastbillingx')
+
+EXPORT_EXTENSIONS = {
+    'onnx': '.onnx',
+    'torchscript': '.torchscript',
+}
+
+# Export format each inference backend loads, so enabling the cache never
+# changes the engine (letterbox, NMS) that produces the detections
+BACKEND_FORMATS = {
+    'ultralytics': 'torchscript',
+    'onnx': 'onnx',
+}
+
+
+class ModelCache:
+    """
+    On-disk cache of prepared (exported) model artifacts
+
+    Exporting YOLOv8 weights to ONNX or TorchScript takes seconds and needs
+    torch. The exported file is stored under a key made of the weights'
+    SHA-256 and the export settings, so later starts load it directly.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, fmt=None):
+        """
+        Args:
+            cache_dir: Directory for cached artifacts and the startup log
+            fmt: Export format, 'onnx' (ONNX Runtime backend) or
+                 'torchscript' (ultralytics backend); default: the format
+                 of the backend passed to prepare(). Setting it explicitly
+                 also selects the backend that loads the artifact.
+        """
+        if fmt is not None and fmt not in EXPORT_EXTENSIONS:
+            raise ValueError(f"Unsupported cache format '{fmt}' (choose from: {', '.join(EXPORT_EXTENSIONS)})")
+        self.cache_dir = cache_dir
+        self.fmt = fmt
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.startup_log_path = os.path.join(cache_dir, 'startup.jsonl')
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def weights_hash(self, weights_path):
+        """
+        SHA-256 of a weights file
+
+        Hashes are remembered per (path, size, mtime), so unchanged weights
+        are not re-read on every start.
+        """
+        stat = os.stat(weights_path)
+        entry_key = os.path.abspath(weights_path)
+        index = self._load_index()
+        entry = index.get(entry_key)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return entry['sha256']
+
+        digest = hashlib.sha256()
+        with open(weights_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        index[entry_key] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        return sha256
+
+    def path_for(self, weights_path, fmt, **settings):
+        """
+        Cache location of the artifact for given weights and export settings
+        """
+        settings = dict(settings, format=fmt)
+        key = hashlib.sha256(
+            (self.weights_hash(weights_path) + json.dumps(settings, sort_keys=True)).encode()
+        ).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(weights_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{key}{EXPORT_EXTENSIONS[fmt]}")
+
+    def prepare(self, weights_path, imgsz=640, backend='ultralytics'):
+        """
+        Get a prepared model artifact, exporting it on a cache miss
+
+        Args:
+            weights_path: Path to .pt weights
+            imgsz: Export input size
+            backend: Backend the lane resolved to ('ultralytics' or 'onnx');
+                     picks the export format unless fmt was set
+
+        Returns:
+            (artifact_path, cache_hit)
+        """
+        fmt = self.fmt or BACKEND_FORMATS[backend]
+        cached_path = self.path_for(weights_path, fmt, imgsz=imgsz, dynamic=fmt == 'onnx')
+        if os.path.exists(cached_path):
+            return cached_path, True
+
+        from ultralytics import YOLO
+
+        export_kwargs = {'dynamic': True} if fmt == 'onnx' else {}
+        exported_path = YOLO(weights_path).export(format=fmt, imgsz=imgsz, **export_kwargs)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = cached_path + '.tmp'
+        shutil.copyfile(exported_path, temp_path)
+        os.replace(temp_path, cached_path)
+        return cached_path, False
+
+    def record_startup(self, startup_times):
+        """
+        Append one startup timing record to the startup log (JSON lines)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        record = dict(startup_times, timestamp=time.time())
+        with open(self.startup_log_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
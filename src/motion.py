@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap frame-difference gate in front of the detector
+
+    Each frame is downscaled to grayscale and compared against a running
+    background and against the last frame that was sent to the detector.
+    When too few pixels changed in both, the frame is considered static and
+    the caller can reuse the previous detections instead of running the
+    model.
+    """
+
+    def __init__(self, width=160, pixel_threshold=25, min_changed_fraction=0.01,
+                 background_alpha=0.05, max_skipped_frames=30):
+        """
+        Args:
+            width: Width of the downscaled comparison frame (pixels)
+            pixel_threshold: Gray-level difference for a pixel to count as changed
+            min_changed_fraction: Fraction of changed pixels that counts as motion
+            background_alpha: Running background update rate (0-1)
+            max_skipped_frames: Force a detection after this many static frames
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.background_alpha = background_alpha
+        self.max_skipped_frames = max_skipped_frames
+
+        self.background = None
+        self.reference = None
+        self.consecutive_skips = 0
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.last_changed_fraction = 0.0
+
+    def _prepare(self, frame):
+        """
+        Downscale and convert a frame to blurred grayscale
+        """
+        h, w = frame.shape[:2]
+        height = max(1, int(round(h * self.width / w)))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def update(self, frame):
+        """
+        Feed a frame to the gate
+
+        Args:
+            frame: BGR image
+
+        Returns:
+            True if the frame should be sent to the detector, False if it is
+            static and previous detections can be reused
+        """
+        self.frames_seen += 1
+        gray = self._prepare(frame)
+
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            self.reference = gray
+            self.consecutive_skips = 0
+            return True
+
+        # Compare against both the slow background and the last detected frame,
+        # so an item removed right after being placed still triggers detection
+        background_diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        reference_diff = cv2.absdiff(gray, self.reference)
+        changed = np.count_nonzero(cv2.max(background_diff, reference_diff) > self.pixel_threshold)
+        self.last_changed_fraction = changed / gray.size
+        cv2.accumulateWeighted(gray, self.background, self.background_alpha)
+
+        if (self.last_changed_fraction >= self.min_changed_fraction
+                or self.consecutive_skips >= self.max_skipped_frames):
+            self.reference = gray
+            self.consecutive_skips = 0
+            return True
+
+        self.consecutive_skips += 1
+        self.frames_skipped += 1
+        return False
+
+    def reset(self):
+        """
+        Forget the background so the next frame is always detected
+        """
+        self.background = None
+        self.reference = None
+        self.consecutive_skips = 0
+
+    def get_stats(self):
+        """
+        Get gate counters
+
+        Returns:
+            Dictionary with frames seen/skipped and the skip ratio
+        """
+        return {
+            'frames_seen': self.frames_seen,
+            'frames_skipped': self.frames_skipped,
+            'skip_ratio': self.frames_skipped / self.frames_seen if self.frames_seen else 0.0,
+            'last_changed_fraction': float(self.last_changed_fraction)
+        }
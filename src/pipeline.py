@@ -0,0 +1,225 @@
+import collections
+import threading
+import time
+
+
+class FrameQueue:
+    """
+    Small bounded queue between two pipeline stages
+
+    With drop_oldest (latest-frame-wins) a full queue discards its oldest
+    item instead of blocking the producer, so a slow consumer always gets
+    the freshest frame and latency never builds up. Without it the
+    producer waits (no frame is lost, e.g. when processing a video file).
+    """
+
+    def __init__(self, maxsize=2, drop_oldest=True):
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item):
+        """
+        Add an item
+
+        Returns:
+            False if the queue was closed (the producer should stop)
+        """
+        with self._cond:
+            while len(self._items) >= self.maxsize and not self._closed:
+                if self.drop_oldest:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    self._cond.wait()
+            if self._closed:
+                return False
+            self._items.append(item)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, block=True):
+        """
+        Take the oldest item
+
+        Returns:
+            The item, or None once the queue is closed and empty (or, with
+            block=False, when nothing is waiting)
+        """
+        with self._cond:
+            while block and not self._items and not self._closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """
+        Stop accepting items; consumers drain what is left
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_stats(self):
+        return {
+            'depth': len(self._items),
+            'max_depth': self.max_depth,
+            'put': self.put_count,
+            'dropped': self.dropped
+        }
+
+
+class Pipeline:
+    """
+    Three-stage capture -> inference -> render pipeline
+
+    Capture and inference each run on their own thread and hand work over
+    through FrameQueues; rendering (display, key handling, video writing)
+    runs on the calling thread because GUI toolkits expect that. Each
+    stage overlaps with the others, so throughput approaches that of the
+    slowest stage instead of the sum of all three.
+    """
+
+    def __init__(self, read_fn, infer_fn, render_fn, batch_size=1, queue_size=2, drop_frames=True):
+        """
+        Args:
+            read_fn: Callable returning the next frame, or None at the end
+            infer_fn: Callable mapping a list of frames to a list of results
+            render_fn: Callable consuming one result; returns False to stop
+            batch_size: Maximum frames handed to infer_fn at once
+            queue_size: Capacity of each inter-stage queue
+            drop_frames: Latest-frame-wins (live sources) instead of
+                         back-pressure (files)
+        """
+        self.read_fn = read_fn
+        self.infer_fn = infer_fn
+        self.render_fn = render_fn
+        self.batch_size = batch_size
+
+        self.frames = FrameQueue(max(queue_size, batch_size), drop_oldest=drop_frames)
+        self.results = FrameQueue(queue_size, drop_oldest=drop_frames)
+
+        self.stage_time = {'capture': 0.0, 'inference': 0.0, 'render': 0.0}
+        self.stage_count = {'capture': 0, 'inference': 0, 'render': 0}
+        self._error = None
+
+    def _record(self, stage, start, count=1):
+        self.stage_time[stage] += time.perf_counter() - start
+        self.stage_count[stage] += count
+
+    def _capture(self):
+        try:
+            while True:
+                start = time.perf_counter()
+                frame = self.read_fn()
+                if frame is None:
+                    break
+                self._record('capture', start)
+                if not self.frames.put(frame):
+                    break
+        except Exception as e:
+            self._error = e
+        finally:
+            self.frames.close()
+
+    def _inference(self):
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    break
+                # Take whatever else is already waiting, up to batch_size
+                batch = [frame]
+                while len(batch) < self.batch_size:
+                    frame = self.frames.get(block=False)
+                    if frame is None:
+                        break
+                    batch.append(frame)
+
+                start = time.perf_counter()
+                results = self.infer_fn(batch)
+                self._record('inference', start, len(batch))
+                for result in results:
+                    if not self.results.put(result):
+                        return
+        except Exception as e:
+            self._error = e
+        finally:
+            self.results.close()
+            # Unblock the capture stage if inference stopped early
+            self.frames.close()
+
+    def run(self):
+        """
+        Run until the source ends or render_fn asks to stop
+        """
+        threads = [
+            threading.Thread(target=self._capture, name='pipeline-capture', daemon=True),
+            threading.Thread(target=self._inference, name='pipeline-inference', daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                result = self.results.get()
+                if result is None:
+                    break
+                start = time.perf_counter()
+                keep_going = self.render_fn(result)
+                self._record('render', start)
+                if keep_going is False:
+                    break
+        finally:
+            self.frames.close()
+            self.results.close()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def get_stats(self):
+        """
+        Get queue and stage counters
+
+        Returns:
+            Dictionary with per-queue depth/drops and per-stage average ms
+        """
+        return {
+            'frame_queue': self.frames.get_stats(),
+            'result_queue': self.results.get_stats(),
+            'stage_ms': {
+                stage: 1000 * self.stage_time[stage] / self.stage_count[stage] if self.stage_count[stage] else 0.0
+                for stage in self.stage_time
+            }
+        }
+
+    def format_stats(self):
+        """
+        One-line summary of get_stats()
+        """
+        stats = self.get_stats()
+        frame_queue = stats['frame_queue']
+        result_queue = stats['result_queue']
+        stage_ms = stats['stage_ms']
+        return (
+            f"Pipeline: capture {stage_ms['capture']:.1f} ms, inference {stage_ms['inference']:.1f} ms, "
+            f"render {stage_ms['render']:.1f} ms per frame | "
+            f"frame queue max {frame_queue['max_depth']}, dropped {frame_queue['dropped']} | "
+            f"result queue max {result_queue['max_depth']}, dropped {result_queue['dropped']}"
+        )
@@ -0,0 +1,220 @@
+from collections import defaultdict
+
+import numpy as np
+
+
+# Product price mapping (comprehensive list for demo)
+DEFAULT_PRICES = {
+    # Fruits
+    'apple': 0.50,
+    'banana': 0.30,
+    'orange': 0.40,
+    'grape': 0.35,
+    'mango': 0.75,
+    'strawberry': 0.60,
+    'blueberry': 0.80,
+    'watermelon': 3.50,
+    'pineapple': 1.50,
+    'lemon': 0.25,
+    
+    # Vegetables
+    'tomato': 0.60,
+    'potato': 0.40,
+    'onion': 0.35,
+    'carrot': 0.45,
+    'cucumber': 0.70,
+    'pepper': 0.90,
+    'lettuce': 1.00,
+    'broccoli': 1.20,
+    'spinach': 0.80,
+    'cabbage': 0.55,
+    
+    # Dairy
+    'milk': 1.50,
+    'yogurt': 1.80,
+    'cheese': 2.50,
+    'butter': 3.00,
+    'cream': 2.00,
+    'egg': 0.25,
+    'eggs': 2.50,
+    
+    # Bread & Bakery
+    'bread': 2.00,
+    'croissant': 1.50,
+    'donut': 0.75,
+    'cake': 3.00,
+    'muffin': 1.00,
+    
+    # Beverages
+    'water': 0.80,
+    'coffee': 5.00,
+    'tea': 3.50,
+    'juice': 2.00,
+    'cola': 1.50,
+    'soda': 1.50,
+    'milk_bottle': 1.50,
+    
+    # Snacks & Sweets
+    'chocolate': 1.20,
+    'candy': 0.50,
+    'chips': 1.00,
+    'cookie': 0.75,
+    'cereal': 4.00,
+    'granola': 3.50,
+    'popcorn': 2.50,
+    
+    # Pantry Items
+    'pasta': 1.80,
+    'rice': 3.00,
+    'flour': 2.50,
+    'sugar': 2.00,
+    'salt': 1.00,
+    'oil': 4.50,
+    'canned_beans': 1.20,
+    'canned_tuna': 1.80,
+    'peanut_butter': 3.00,
+    'jam': 2.50,
+    
+    # Condiments
+    'ketchup': 2.00,
+    'mustard': 1.50,
+    'mayo': 2.50,
+    'vinegar': 1.80,
+    'soy_sauce': 2.00,
+    
+    # Frozen Foods
+    'frozen_pizza': 5.00,
+    'frozen_vegetables': 3.50,
+    'ice_cream': 4.00,
+    'frozen_fish': 6.00,
+    'frozen_chicken': 5.50,
+    
+    # Household Items
+    'soap': 1.50,
+    'shampoo': 3.00,
+    'toothpaste': 2.00,
+    'detergent': 2.50,
+    'toilet_paper': 3.00,
+    'tissues': 1.00,
+    'paper_towels': 1.50,
+    
+    # Personal Care
+    'deodorant': 2.50,
+    'lotion': 3.00,
+    'sunscreen': 4.00,
+    
+    # More generic items (for generalization)
+    'item': 1.00,
+    'product': 1.00,
+    'object': 1.00,
+}
+
+
+def normalize_name(name):
+    """
+    Normalize a product/class name for catalog lookups
+    
+    'Peanut Butter', 'peanut-butter' and 'peanut_butter' all map to the
+    same key.
+    """
+    return str(name).strip().lower().replace(' ', '_').replace('-', '_')
+
+
+class PriceCatalog:
+    """
+    Price table compiled against a model's class ids
+    
+    Names are normalized once at load time and prices are stored in a NumPy
+    array indexed by class id, so pricing a whole frame is a single gather.
+    """
+    
+    def __init__(self, class_names, price_map=None, default_price=1.00):
+        """
+        Args:
+            class_names: Mapping of class id -> class name (model.names)
+            price_map: Mapping of product name -> unit price (default: DEFAULT_PRICES)
+            default_price: Price charged for classes missing from the catalog
+        """
+        if price_map is None:
+            price_map = DEFAULT_PRICES
+        self.default_price = default_price
+        self.price_map = {normalize_name(name): float(price) for name, price in price_map.items()}
+        self._keys = {}
+        self.compile(class_names)
+    
+    def _key(self, name):
+        """
+        Normalized key for a name (memoized so repeated lookups skip string work)
+        """
+        key = self._keys.get(name)
+        if key is None:
+            key = self._keys[name] = normalize_name(name)
+        return key
+    
+    def compile(self, class_names):
+        """
+        Build the class id -> price array for a set of model classes
+        
+        Args:
+            class_names: Mapping of class id -> class name
+        """
+        self.class_names = class_names
+        size = max(class_names) + 1 if class_names else 0
+        self.prices = np.full(size, self.default_price, dtype=np.float64)
+        self._ids_by_key = defaultdict(list)
+        self.missing = {}
+        
+        for class_id, name in class_names.items():
+            key = self._key(name)
+            self._ids_by_key[key].append(class_id)
+            if key in self.price_map:
+                self.prices[class_id] = self.price_map[key]
+            else:
+                self.missing[class_id] = name
+    
+    def prices_for(self, class_ids):
+        """
+        Gather unit prices for an array of class ids
+        
+        Args:
+            class_ids: Integer array of class ids
+            
+        Returns:
+            Float array of prices (default price for unknown ids)
+        """
+        class_ids = np.asarray(class_ids, dtype=np.intp)
+        in_range = (class_ids >= 0) & (class_ids < len(self.prices))
+        if in_range.all():
+            return self.prices[class_ids]
+        
+        # Ids outside the compiled table get the default price
+        prices = np.full(len(class_ids), self.default_price, dtype=np.float64)
+        prices[in_range] = self.prices[class_ids[in_range]]
+        return prices
+    
+    def get(self, name):
+        """
+        Get unit price for a product name
+        """
+        return self.price_map.get(self._key(name), self.default_price)
+    
+    def update(self, name, price):
+        """
+        Set unit price for a product name and patch the compiled table
+        """
+        key = self._key(name)
+        self.price_map[key] = price
+        class_ids = self._ids_by_key.get(key)
+        if class_ids:
+            self.prices[class_ids] = price
+            for class_id in class_ids:
+                self.missing.pop(class_id, None)
+    
+    def missing_skus(self):
+        """
+        Model classes that have no catalog price
+        
+        Returns:
+            List of class names, ordered by class id
+        """
+        return [self.missing[class_id] for class_id in sorted(self.missing)]
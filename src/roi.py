@@ -0,0 +1,151 @@
+import json
+
+import numpy as np
+
+
+class ScanZone:
+    """
+    Region of a camera frame where items are scanned
+
+    A zone is either an axis-aligned rectangle or a polygon. Only the zone's
+    bounding rectangle is cropped and sent to the model; for polygons,
+    detections whose center falls outside the polygon are dropped.
+    """
+
+    def __init__(self, rect=None, polygon=None, name=None):
+        """
+        Args:
+            rect: [x1, y1, x2, y2] in frame pixels
+            polygon: List of [x, y] vertices in frame pixels
+            name: Optional zone label
+        """
+        if (rect is None) == (polygon is None):
+            raise ValueError("ScanZone needs exactly one of rect or polygon")
+
+        if rect is not None:
+            x1, y1, x2, y2 = rect
+            self.polygon = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+            self.is_rect = True
+        else:
+            self.polygon = np.asarray(polygon, dtype=np.float32).reshape(-1, 2)
+            if len(self.polygon) < 3:
+                raise ValueError("ScanZone polygon needs at least 3 points")
+            self.is_rect = False
+
+        self.name = name
+
+    def __repr__(self):
+        kind = 'rect' if self.is_rect else 'polygon'
+        return f"ScanZone({kind}, name={self.name!r})"
+
+    def bounds(self, frame_shape):
+        """
+        Integer bounding rectangle of the zone, clipped to the frame
+
+        Args:
+            frame_shape: Shape of the frame (h, w[, c])
+
+        Returns:
+            (x1, y1, x2, y2); empty if the zone lies outside the frame
+        """
+        h, w = frame_shape[:2]
+        x1, y1 = np.floor(self.polygon.min(axis=0)).astype(int)
+        x2, y2 = np.ceil(self.polygon.max(axis=0)).astype(int)
+        return max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+
+    def contains_points(self, points):
+        """
+        Vectorized point-in-polygon test (even-odd rule)
+
+        Args:
+            points: (N, 2) array of [x, y]
+
+        Returns:
+            (N,) boolean mask
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        x = points[:, 0:1]
+        y = points[:, 1:2]
+        x1, y1 = self.polygon[:, 0], self.polygon[:, 1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+        spans = (y1 > y) != (y2 > y)
+        dy = np.where(y2 == y1, 1e-9, y2 - y1)
+        x_cross = (x2 - x1) * (y - y1) / dy + x1
+        crossings = spans & (x < x_cross)
+        return crossings.sum(axis=1) % 2 == 1
+
+    def contains_boxes(self, boxes):
+        """
+        Test which boxes have their center inside the zone
+
+        Args:
+            boxes: (N, 4) array of [x1, y1, x2, y2]
+
+        Returns:
+            (N,) boolean mask
+        """
+        centers = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2], axis=1)
+        return self.contains_points(centers)
+
+
+def tile_region(region, tile_size, overlap=0.2):
+    """
+    Split a rectangle into overlapping square tiles
+
+    Tiles are spread evenly so that neighbours overlap by at least the
+    requested fraction and the last tile is flush with the region edge.
+
+    Args:
+        region: (x1, y1, x2, y2)
+        tile_size: Tile side length in pixels
+        overlap: Fraction of tile_size shared by neighbouring tiles
+
+    Returns:
+        List of (x1, y1, x2, y2) tiles
+    """
+    x1, y1, x2, y2 = region
+    stride = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(low, high):
+        if high - low <= tile_size:
+            return [low]
+        count = int(np.ceil((high - low - tile_size) / stride)) + 1
+        return np.linspace(low, high - tile_size, count).round().astype(int).tolist()
+
+    return [
+        (tx, ty, min(tx + tile_size, x2), min(ty + tile_size, y2))
+        for ty in starts(y1, y2)
+        for tx in starts(x1, x2)
+    ]
+
+
+def load_scan_zones(path, camera_id='default'):
+    """
+    Load scan zones for one camera from a JSON file
+
+    Expected format:
+        {
+            "lane_1": [
+                {"name": "tray", "rect": [100, 200, 900, 700]},
+                {"name": "scale", "polygon": [[950, 300], [1200, 300], [1150, 650]]}
+            ]
+        }
+
+    Args:
+        path: Path to the JSON config
+        camera_id: Key of the camera in the config
+
+    Returns:
+        List of ScanZone
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    if camera_id not in config:
+        raise KeyError(f"Camera '{camera_id}' not found in {path} (available: {', '.join(config)})")
+
+    return [
+        ScanZone(rect=zone.get('rect'), polygon=zone.get('polygon'), name=zone.get('name'))
+        for zone in config[camera_id]
+    ]
@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.cart_manager import CartManager
+
+
+class _Shard:
+    """
+    One lock and the LRU-ordered resident carts it guards
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.carts = OrderedDict()
+        self.last_access = {}
+        self.evictions = 0
+        self.reloads = 0
+
+
+class SessionStore:
+    """
+    Many concurrent carts (one per lane / customer session) in one process
+
+    Sessions are spread over shards by a stable hash of their id, and each
+    shard has its own lock, so lanes only contend when they share a shard.
+    Each shard keeps at most its share of max_resident carts in memory;
+    the least recently used carts are snapshotted to spill_dir and loaded
+    back transparently on their next access.
+    """
+
+    def __init__(self, spill_dir, max_resident=1000, shards=16, dedup_cooldown=2.0, event_sink=None):
+        """
+        Args:
+            spill_dir: Directory for evicted session snapshots
+            max_resident: Maximum carts kept in memory across all shards
+            shards: Number of independently locked shards
+            dedup_cooldown: CartManager dedup cooldown for new sessions
+            event_sink: Optional EventSink shared by all carts
+        """
+        if shards < 1:
+            raise ValueError(f"Session store needs at least one shard, got {shards}")
+        self.spill_dir = spill_dir
+        self.shard_capacity = max(1, -(-max_resident // shards))
+        self.dedup_cooldown = dedup_cooldown
+        self.event_sink = event_sink
+        self._shards = [_Shard() for _ in range(shards)]
+        os.makedirs(spill_dir, exist_ok=True)
+
+    def _shard(self, session_id):
+        return self._shards[zlib.crc32(session_id.encode()) % len(self._shards)]
+
+    def _spill_path(self, session_id):
+        return os.path.join(self.spill_dir, f"{session_id}.json")
+
+    def _new_cart(self, session_id=None):
+        return CartManager(dedup_cooldown=self.dedup_cooldown, event_sink=self.event_sink,
+                           session_id=session_id)
+
+    def _make_resident(self, shard, session_id, cart):
+        """
+        Insert a cart as most recently used, evicting idle carts if needed
+        (shard lock held)
+        """
+        shard.carts[session_id] = cart
+        shard.last_access[session_id] = time.monotonic()
+        while len(shard.carts) > self.shard_capacity:
+            oldest_id = next(iter(shard.carts))
+            self._evict(shard, oldest_id)
+
+    def _evict(self, shard, session_id):
+        """
+        Snapshot a cart to disk and drop it from memory (shard lock held)
+        """
+        cart = shard.carts.pop(session_id)
+        shard.last_access.pop(session_id, None)
+        path = self._spill_path(session_id)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(cart.snapshot(include_history=True), f)
+        os.replace(temp_path, path)
+        shard.evictions += 1
+
+    def _load(self, shard, session_id):
+        """
+        Get a resident cart, reloading it from disk if it was evicted
+        (shard lock held)
+        """
+        cart = shard.carts.get(session_id)
+        if cart is not None:
+            shard.carts.move_to_end(session_id)
+            shard.last_access[session_id] = time.monotonic()
+            return cart
+
+        path = self._spill_path(session_id)
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Unknown session '{session_id}'") from None
+
+        cart = CartManager.from_snapshot(snapshot, dedup_cooldown=self.dedup_cooldown,
+                                         event_sink=self.event_sink)
+        os.remove(path)
+        shard.reloads += 1
+        self._make_resident(shard, session_id, cart)
+        return cart
+
+    def create(self, session_id=None):
+        """
+        Start a new session
+
+        Args:
+            session_id: Optional id (default: new unique id)
+
+        Returns:
+            The session id
+        """
+        if session_id is not None and (not session_id or os.sep in session_id or session_id.startswith('.')):
+            raise ValueError(f"Invalid session id '{session_id}'")
+        cart = self._new_cart(session_id)
+        shard = self._shard(cart.session_id)
+        with shard.lock:
+            if cart.session_id in shard.carts or os.path.exists(self._spill_path(cart.session_id)):
+                raise ValueError(f"Session '{cart.session_id}' already exists")
+            self._make_resident(shard, cart.session_id, cart)
+        return cart.session_id
+
+    @contextmanager
+    def session(self, session_id):
+        """
+        Context manager giving exclusive access to a session's cart
+
+        Carts can be evicted once the block exits, so keep using them
+        through this context rather than holding references.
+
+        Yields:
+            CartManager of the session
+        """
+        shard = self._shard(session_id)
+        with shard.lock:
+            yield self._load(shard, session_id)
+
+    def add_items(self, session_id, detections, timestamp=None):
+        """
+        Add one frame's detections to a session's cart
+
+        Returns:
+            Number of items added
+        """
+        with self.session(session_id) as cart:
+            return cart.add_items(detections, timestamp)
+
+    def close(self, session_id):
+        """
+        End a session and forget it (memory and disk)
+
+        Returns:
+            Final snapshot of the session's cart
+        """
+        shard = self._shard(session_id)
+        with shard.lock:
+            cart = self._load(shard, session_id)
+            del shard.carts[session_id]
+            shard.last_access.pop(session_id, None)
+        return cart.snapshot(include_history=True)
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Spill every cart that has not been used for max_idle_seconds
+
+        Returns:
+            Number of carts evicted
+        """
+        now = time.monotonic()
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                idle = [session_id for session_id, last in shard.last_access.items()
+                        if now - last >= max_idle_seconds]
+                for session_id in idle:
+                    self._evict(shard, session_id)
+                evicted += len(idle)
+        return evicted
+
+    def __contains__(self, session_id):
+        shard = self._shard(session_id)
+        with shard.lock:
+            return session_id in shard.carts or os.path.exists(self._spill_path(session_id))
+
+    def get_stats(self):
+        """
+        Get store counters
+
+        Returns:
+            Dictionary with resident / spilled sessions, evictions and reloads
+        """
+        resident = sum(len(shard.carts) for shard in self._shards)
+        spilled = sum(1 for name in os.listdir(self.spill_dir) if name.endswith('.json'))
+        return {
+            'resident': resident,
+            'spilled': spilled,
+            'evictions': sum(shard.evictions for shard in self._shards),
+            'reloads': sum(shard.reloads for shard in self._shards)
+        }
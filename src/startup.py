@@ -0,0 +1,92 @@
+import importlib
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+
+
+# Python modules each inference backend needs at runtime (module name, pip
+# package). Kept here, free of heavy imports, so dependency checks can read
+# it without loading cv2/numpy.
+BACKEND_REQUIREMENTS = {
+    'ultralytics': [('ultralytics', 'ultralytics'), ('torch', 'torch')],
+    'onnx': [('onnxruntime', 'onnxruntime')],
+}
+
+
+def is_installed(module_name):
+    """
+    Check whether a module can be imported, without importing it
+
+    Args:
+        module_name: Top-level module name (e.g. 'torch')
+
+    Returns:
+        True if the module is discoverable on sys.path
+    """
+    if module_name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class StartupProfiler:
+    """
+    Records how long each import and startup phase takes
+
+    Used by run_demo.py to show where time goes between process start and
+    the first frame (kiosk reboots, crash restarts).
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.records = []
+
+    def time_import(self, module_name):
+        """
+        Import a module and record the time it took
+
+        Modules that are already loaded show up with (near) zero cost, which
+        is accurate: nothing was paid for them at this point.
+
+        Returns:
+            The imported module
+        """
+        already_loaded = module_name in sys.modules
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        label = f"import {module_name}" + (" (cached)" if already_loaded else "")
+        self.records.append((label, time.perf_counter() - start))
+        return module
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager timing a named startup phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((name, time.perf_counter() - start))
+
+    def total(self):
+        """
+        Seconds elapsed since the profiler was created
+        """
+        return time.perf_counter() - self.start
+
+    def report(self):
+        """
+        Format the recorded timings as a small table
+
+        Returns:
+            Report string
+        """
+        lines = ["[*] Startup time breakdown:"]
+        for name, seconds in self.records:
+            lines.append(f"    {name:<36} {seconds * 1000:>8.1f} ms")
+        lines.append(f"    {'total':<36} {self.total() * 1000:>8.1f} ms")
+        return "\n".join(lines)
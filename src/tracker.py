@@ -0,0 +1,141 @@
+import numpy as np
+
+from src.box_ops import box_iou
+
+
+class IoUTracker:
+    """
+    Lightweight IoU tracker between the detector and the cart
+
+    Detections are associated with existing tracks through one IoU matrix
+    per frame (same class only). A track is committed to the cart exactly
+    once, after it has been seen min_hits times, and is forgotten after
+    max_age frames without a match. All track state lives in NumPy arrays,
+    so the per-frame cost stays small with dozens of boxes in view.
+    """
+
+    def __init__(self, iou_threshold=0.3, min_hits=3, max_age=15):
+        """
+        Args:
+            iou_threshold: Minimum IoU to continue a track
+            min_hits: Matches needed before a track is committed to the cart
+            max_age: Frames a track survives without being matched
+        """
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_age = max_age
+
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.class_ids = np.zeros(0, dtype=np.int32)
+        self.track_ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int32)
+        self.misses = np.zeros(0, dtype=np.int32)
+        self.committed = np.zeros(0, dtype=bool)
+
+        self.next_track_id = 1
+        self.total_commits = 0
+
+    def _associate(self, boxes, class_ids):
+        """
+        Greedy IoU matching between tracks and detections
+
+        Returns:
+            (track_rows, detection_rows) arrays of matched pairs
+        """
+        if len(self.boxes) == 0 or len(boxes) == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+        ious = box_iou(self.boxes, boxes)
+        ious[self.class_ids[:, None] != class_ids[None, :]] = 0.0
+
+        track_rows, detection_rows = np.nonzero(ious >= self.iou_threshold)
+        if len(track_rows) == 0:
+            return track_rows, detection_rows
+
+        # Best pairs first; each track and detection is used at most once
+        order = np.argsort(-ious[track_rows, detection_rows], kind='stable')
+        used_tracks = np.zeros(len(self.boxes), dtype=bool)
+        used_detections = np.zeros(len(boxes), dtype=bool)
+        matched_tracks = []
+        matched_detections = []
+        for track_row, detection_row in zip(track_rows[order], detection_rows[order]):
+            if used_tracks[track_row] or used_detections[detection_row]:
+                continue
+            used_tracks[track_row] = True
+            used_detections[detection_row] = True
+            matched_tracks.append(track_row)
+            matched_detections.append(detection_row)
+
+        return np.array(matched_tracks, dtype=np.intp), np.array(matched_detections, dtype=np.intp)
+
+    def update(self, detections):
+        """
+        Advance the tracker by one frame
+
+        Args:
+            detections: Detections of the current frame
+
+        Returns:
+            Indices into detections of items to commit to the cart now
+            (one per newly confirmed physical item)
+        """
+        boxes = detections.boxes
+        class_ids = detections.class_ids
+        track_rows, detection_rows = self._associate(boxes, class_ids)
+
+        # Matched tracks follow their detection
+        self.boxes[track_rows] = boxes[detection_rows]
+        self.hits[track_rows] += 1
+        self.misses += 1
+        self.misses[track_rows] = 0
+
+        # Unmatched detections start new tracks
+        new_rows = np.setdiff1d(np.arange(len(boxes)), detection_rows, assume_unique=True)
+        count = len(new_rows)
+        first_new = len(self.boxes)
+        self.boxes = np.concatenate([self.boxes, boxes[new_rows]])
+        self.class_ids = np.concatenate([self.class_ids, class_ids[new_rows]])
+        self.track_ids = np.concatenate([self.track_ids, np.arange(self.next_track_id, self.next_track_id + count)])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int32)])
+        self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int32)])
+        self.committed = np.concatenate([self.committed, np.zeros(count, dtype=bool)])
+        self.next_track_id += count
+
+        # Map every track row that saw a detection this frame to that detection
+        seen_tracks = np.concatenate([track_rows, np.arange(first_new, first_new + count)])
+        seen_detections = np.concatenate([detection_rows, new_rows])
+
+        ready = ~self.committed[seen_tracks] & (self.hits[seen_tracks] >= self.min_hits)
+        self.committed[seen_tracks[ready]] = True
+        commit_rows = np.sort(seen_detections[ready])
+        self.total_commits += len(commit_rows)
+
+        # Drop tracks that have been missing for too long
+        alive = self.misses <= self.max_age
+        if not alive.all():
+            self.boxes = self.boxes[alive]
+            self.class_ids = self.class_ids[alive]
+            self.track_ids = self.track_ids[alive]
+            self.hits = self.hits[alive]
+            self.misses = self.misses[alive]
+            self.committed = self.committed[alive]
+
+        return commit_rows
+
+    def reset(self):
+        """
+        Forget all tracks (e.g. when the cart is cleared)
+        """
+        self.__init__(self.iou_threshold, self.min_hits, self.max_age)
+
+    def get_stats(self):
+        """
+        Get tracker counters
+
+        Returns:
+            Dictionary with active tracks and total cart commits
+        """
+        return {
+            'active_tracks': len(self.track_ids),
+            'total_commits': self.total_commits
+        }
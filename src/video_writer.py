@@ -0,0 +1,121 @@
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+
+class AsyncVideoWriter:
+    """
+    cv2.VideoWriter that encodes on a background thread
+
+    write() copies the frame into one of a fixed pool of preallocated
+    buffers and returns; a dedicated thread encodes the buffers in order.
+    When every buffer is waiting to be encoded, write() either blocks until
+    one is free ('block', no frame lost) or skips the frame ('drop', the
+    caller's frame rate is never affected). release() encodes everything
+    still queued before closing the file.
+    """
+
+    def __init__(self, path, fourcc, fps, frame_size, queue_size=8, policy='block'):
+        """
+        Args:
+            path: Output video file
+            fourcc: FourCC code (e.g. 'mp4v') or an int from VideoWriter_fourcc
+            fps: Output frame rate
+            frame_size: (width, height) of the output video
+            queue_size: Number of preallocated frame buffers
+            policy: 'block' (back-pressure) or 'drop' (skip frames when the
+                    encoder falls behind)
+        """
+        if policy not in ('block', 'drop'):
+            raise ValueError(f"Unknown writer policy '{policy}' (choose 'block' or 'drop')")
+        if isinstance(fourcc, str):
+            fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.path = path
+        self.frame_size = tuple(frame_size)
+        self.policy = policy
+        self._writer = cv2.VideoWriter(path, fourcc, fps, self.frame_size)
+
+        width, height = self.frame_size
+        self._buffers = np.empty((queue_size, height, width, 3), dtype=np.uint8)
+        self._free = queue.Queue()
+        for index in range(queue_size):
+            self._free.put(index)
+        self._ready = queue.Queue()
+
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.max_depth = 0
+        self._error = None
+        self._released = False
+
+        self._thread = threading.Thread(target=self._encode, name='video-writer', daemon=True)
+        self._thread.start()
+
+    def isOpened(self):
+        return self._writer.isOpened()
+
+    def write(self, frame):
+        """
+        Queue a BGR frame for encoding
+
+        Returns:
+            False if the frame was dropped
+        """
+        if self._released:
+            raise RuntimeError(f"Write to released video writer {self.path}")
+        try:
+            index = self._free.get(block=self.policy == 'block')
+        except queue.Empty:
+            self.frames_dropped += 1
+            return False
+
+        buffer = self._buffers[index]
+        if frame.shape[1::-1] == self.frame_size and frame.ndim == 3:
+            np.copyto(buffer, frame)
+        else:
+            cv2.resize(frame, self.frame_size, dst=buffer)
+        self._ready.put(index)
+        self.max_depth = max(self.max_depth, self._ready.qsize())
+        return True
+
+    def _encode(self):
+        while True:
+            index = self._ready.get()
+            if index is None:
+                return
+            try:
+                if self._error is None:
+                    self._writer.write(self._buffers[index])
+                    self.frames_written += 1
+            except Exception as e:
+                self._error = e
+            finally:
+                self._free.put(index)
+
+    def release(self):
+        """
+        Encode the remaining frames and close the file
+        """
+        if self._released:
+            return
+        self._released = True
+        self._ready.put(None)
+        self._thread.join()
+        self._writer.release()
+        if self._error is not None:
+            raise self._error
+
+    def get_stats(self):
+        """
+        Get writer counters
+
+        Returns:
+            Dictionary with frames written / dropped and max queue depth
+        """
+        return {
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'max_depth': self.max_depth
+        }
@@ -1,3 +1,6 @@
+import zlib
+from collections import OrderedDict
+
 import cv2
 import numpy as np
 
@@ -25,95 +28,158 @@ class Visualizer:
         self.font = cv2.FONT_HERSHEY_SIMPLEX
         self.font_scale = 0.6
         self.font_thickness = 2
+        
+        # Cart panel width and render caches
+        self.panel_width = 380
+        self._panel_cache = None
+        
+        # Detection label sprites (LRU) and per-class colors
+        self.max_label_sprites = 512
+        self._label_sprites = OrderedDict()
+        self._class_colors = {}
     
     def draw_detections(self, image, detections):
         """
         Draw bounding boxes and labels on image
         
+        Labels are pre-rendered sprites (cached per name, price and
+        displayed confidence) copied into the frame by slicing.
+        
         Args:
             image: Input image
-            detections: List of detection dictionaries
+            detections: Detections or list of detection dictionaries
             
         Returns:
             Image with annotations
         """
-        for idx, det in enumerate(detections):
-            x1, y1, x2, y2 = det['bbox']
-            name = det['name']
-            confidence = det['confidence']
-            price = det.get('price', 0)
-            
-            # Generate color based on product name hash
-            color_idx = hash(name) % len(self.colors)
-            color = self.colors[color_idx]
+        if hasattr(detections, 'boxes'):
+            rows = zip(
+                detections.boxes.astype(int).tolist(),
+                detections.names,
+                detections.scores.tolist(),
+                detections.prices.tolist()
+            )
+        else:
+            rows = ((det['bbox'], det['name'], det['confidence'], det.get('price', 0)) for det in detections)
+        
+        h, w = image.shape[:2]
+        for (x1, y1, x2, y2), name, confidence, price in rows:
+            color = self.color_for(name)
             
             # Draw bounding box
             cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
             
-            # Create label with price and confidence
-            label = f"{name}: ${price:.2f} ({confidence:.0%})"
-            
-            # Calculate text size for background
-            (text_width, text_height), baseline = cv2.getTextSize(
-                label, self.font, self.font_scale, self.font_thickness
-            )
-            
-            # Draw label background (filled rectangle)
-            cv2.rectangle(
-                image, 
-                (x1, y1 - text_height - 10),
-                (x1 + text_width + 5, y1),
-                color,
-                -1
-            )
-            
-            # Draw label text
-            cv2.putText(
-                image,
-                label,
-                (x1 + 3, y1 - 5),
-                self.font,
-                self.font_scale,
-                (255, 255, 255),  # White text
-                self.font_thickness,
-                cv2.LINE_AA
-            )
+            # Label sprite: filled background with the text, bottom-left at (x1, y1)
+            sprite = self._label_sprite(name, price, round(confidence * 100), color)
+            top = y1 - sprite.shape[0] + 1
+            sx1, sy1 = max(x1, 0), max(top, 0)
+            sx2, sy2 = min(x1 + sprite.shape[1], w), min(top + sprite.shape[0], h)
+            if sx2 > sx1 and sy2 > sy1:
+                image[sy1:sy2, sx1:sx2] = sprite[sy1 - top:sy2 - top, sx1 - x1:sx2 - x1]
         
         return image
     
-    def draw_cart_overlay(self, image, cart_items, fps=0):
+    def color_for(self, name):
+        """
+        Stable color for a class name (same in every process, unlike hash())
+        """
+        color = self._class_colors.get(name)
+        if color is None:
+            color = self.colors[zlib.crc32(name.encode()) % len(self.colors)]
+            self._class_colors[name] = color
+        return color
+    
+    def _label_sprite(self, name, price, confidence_pct, color):
+        """
+        Rendered label (background + text) for one label text, LRU-cached
+        """
+        key = (name, round(price, 2), confidence_pct)
+        sprite = self._label_sprites.get(key)
+        if sprite is not None:
+            self._label_sprites.move_to_end(key)
+            return sprite
+        
+        # Create label with price and confidence
+        label = f"{name}: ${price:.2f} ({confidence_pct}%)"
+        
+        # Calculate text size for background
+        (text_width, text_height), baseline = cv2.getTextSize(
+            label, self.font, self.font_scale, self.font_thickness
+        )
+        
+        # Label background (filled rectangle) and white text
+        sprite = np.empty((text_height + 11, text_width + 6, 3), dtype=np.uint8)
+        sprite[:] = color
+        cv2.putText(
+            sprite,
+            label,
+            (3, text_height + 5),
+            self.font,
+            self.font_scale,
+            (255, 255, 255),  # White text
+            self.font_thickness,
+            cv2.LINE_AA
+        )
+        
+        self._label_sprites[key] = sprite
+        if len(self._label_sprites) > self.max_label_sprites:
+            self._label_sprites.popitem(last=False)
+        return sprite
+    
+    def draw_cart_overlay(self, image, cart_items, fps=0, total=None, item_count=None, cart_version=None):
         """
         Draw cart overlay on the right side of the image
         
+        Only the panel region is dimmed (in place). The panel's text is
+        rendered once per cart state and reused while the cart is unchanged.
+        
         Args:
             image: Input image
             cart_items: Dictionary of cart items
             fps: Current FPS counter
+            total: Cart total (e.g. CartManager.get_total()); summed from
+                   cart_items when not given
+            item_count: Cart item count; summed from cart_items when not given
+            cart_version: Optional CartManager.version; when given it
+                          identifies the cart state instead of its contents
             
         Returns:
             Image with cart overlay
         """
         h, w = image.shape[:2]
-        overlay_width = 380
+        overlay_width = self.panel_width
+        if total is None:
+            total = sum(item['total_price'] for item in cart_items.values()) if cart_items else 0
+        if item_count is None:
+            item_count = sum(item['quantity'] for item in cart_items.values()) if cart_items else 0
         
-        # Create semi-transparent overlay
-        overlay = image.copy()
-        cv2.rectangle(overlay, (w - overlay_width, 0), (w, h), (0, 0, 0), -1)
-        image = cv2.addWeighted(overlay, 0.7, image, 0.3, 0)
+        # Dim the panel region only: 0.7 * black + 0.3 * image
+        panel_x = max(0, w - overlay_width)
+        panel = image[:, panel_x:]
+        cv2.convertScaleAbs(panel, dst=panel, alpha=0.3)
         
-        # Cart header with shopping bag emoji
-        y_offset = 40
-        header_text = "SHOPPING CART"
-        cv2.putText(
-            image,
-            header_text,
-            (w - overlay_width + 20, y_offset),
-            self.font,
-            0.9,
-            (0, 255, 0),
-            2,
-            cv2.LINE_AA
-        )
+        # Cached text layer for this cart state
+        if cart_version is not None:
+            state = cart_version
+        else:
+            state = tuple(
+                (name, details['quantity'], details['total_price'])
+                for name, details in list(cart_items.items())[:8]
+            ) + (len(cart_items),)
+        key = (state, h, total, item_count)
+        if self._panel_cache is None or self._panel_cache[0] != key:
+            self._panel_cache = (key,) + self._render_cart_panel(cart_items, h, total, item_count)
+        _, ys, xs, alpha, color = self._panel_cache
+        
+        # Only the drawn pixels are blended (a few percent of the panel),
+        # weighted by their anti-aliasing coverage
+        crop = overlay_width - panel.shape[1]
+        if crop > 0:
+            visible = xs >= crop
+            ys, xs, alpha, color = ys[visible], xs[visible], alpha[visible], color[visible]
+        xs = xs - crop
+        blended = panel[ys, xs] * (1.0 - alpha) + color
+        panel[ys, xs] = (blended + 0.5).astype(np.uint8)
         
         # FPS counter (top left)
         cv2.putText(
@@ -127,18 +193,62 @@ class Visualizer:
             cv2.LINE_AA
         )
         
+        return image
+    
+    def _render_cart_panel(self, cart_items, h, total, item_count):
+        """
+        Render the cart panel's text and lines as coverage and color
+        
+        The panel is drawn once on black and once on white; how much of the
+        background still shows through a pixel gives its anti-aliasing
+        coverage, so edges blend into the frame instead of leaving dark
+        fringes.
+        
+        Returns:
+            (ys, xs, alpha, color) of the drawn pixels: (N,) coordinates,
+            (N, 1) coverage and (N, 3) coverage-weighted color
+        """
+        on_black = np.zeros((h, self.panel_width, 3), dtype=np.uint8)
+        on_white = np.full((h, self.panel_width, 3), 255, dtype=np.uint8)
+        self._draw_cart_panel(on_black, cart_items, total, item_count)
+        self._draw_cart_panel(on_white, cart_items, total, item_count)
+        
+        background = (on_white.astype(np.float32) - on_black).mean(axis=2)
+        ys, xs = np.nonzero(background < 255)
+        alpha = 1.0 - background[ys, xs, None] / 255.0
+        return ys, xs, alpha, on_black[ys, xs].astype(np.float32)
+    
+    def _draw_cart_panel(self, layer, cart_items, total, item_count):
+        """
+        Draw the cart panel's text and lines onto a panel-sized layer
+        """
+        h = layer.shape[0]
+        w = overlay_width = self.panel_width
+        
+        # Cart header with shopping bag emoji
+        y_offset = 40
+        header_text = "SHOPPING CART"
+        cv2.putText(
+            layer,
+            header_text,
+            (w - overlay_width + 20, y_offset),
+            self.font,
+            0.9,
+            (0, 255, 0),
+            2,
+            cv2.LINE_AA
+        )
+        
         # Divider line
         y_offset += 15
-        cv2.line(image, (w - overlay_width + 10, y_offset + 10), 
+        cv2.line(layer, (w - overlay_width + 10, y_offset + 10), 
                 (w - 10, y_offset + 10), (100, 100, 100), 1)
         
         # Cart items
         y_offset += 40
-        total = 0
-        
         if not cart_items:
             cv2.putText(
-                image,
+                layer,
                 "No items detected yet...",
                 (w - overlay_width + 15, y_offset),
                 self.font,
@@ -156,14 +266,13 @@ class Visualizer:
                 price = details.get('price', 0)
                 item_total = details['total_price']
                 confidence = details.get('confidence', 0)
-                total += item_total
                 
                 # Item name (truncated)
                 item_display = item_name[:14]
                 item_text = f"• {item_display}"
                 
                 cv2.putText(
-                    image,
+                    layer,
                     item_text,
                     (w - overlay_width + 15, y_offset),
                     self.font,
@@ -176,7 +285,7 @@ class Visualizer:
                 # Quantity
                 qty_text = f"x{quantity}"
                 cv2.putText(
-                    image,
+                    layer,
                     qty_text,
                     (w - overlay_width + 200, y_offset),
                     self.font,
@@ -189,7 +298,7 @@ class Visualizer:
                 # Item total price
                 price_text = f"${item_total:.2f}"
                 cv2.putText(
-                    image,
+                    layer,
                     price_text,
                     (w - 100, y_offset),
                     self.font,
@@ -205,7 +314,7 @@ class Visualizer:
             if len(cart_items) > 8:
                 more_text = f"+{len(cart_items) - 8} more items"
                 cv2.putText(
-                    image,
+                    layer,
                     more_text,
                     (w - overlay_width + 15, y_offset),
                     self.font,
@@ -218,14 +327,14 @@ class Visualizer:
         
         # Separator line
         y_offset += 5
-        cv2.line(image, (w - overlay_width + 10, y_offset), 
+        cv2.line(layer, (w - overlay_width + 10, y_offset), 
                 (w - 10, y_offset), (100, 100, 100), 2)
         y_offset += 15
         
         # Total price display
         total_text = "TOTAL:"
         cv2.putText(
-            image,
+            layer,
             total_text,
             (w - overlay_width + 20, y_offset),
             self.font,
@@ -237,7 +346,7 @@ class Visualizer:
         
         price_display = f"${total:.2f}"
         cv2.putText(
-            image,
+            layer,
             price_display,
             (w - 120, y_offset),
             self.font,
@@ -249,10 +358,9 @@ class Visualizer:
         
         # Item count
         y_offset += 30
-        item_count = sum(item['quantity'] for item in cart_items.values()) if cart_items else 0
         count_text = f"Items: {item_count}"
         cv2.putText(
-            image,
+            layer,
             count_text,
             (w - overlay_width + 20, y_offset),
             self.font,
@@ -273,7 +381,7 @@ class Visualizer:
         
         for instruction in instructions:
             cv2.putText(
-                image,
+                layer,
                 instruction,
                 (w - overlay_width + 15, y_offset),
                 cv2.FONT_HERSHEY_SIMPLEX,
@@ -283,7 +391,21 @@ class Visualizer:
                 cv2.LINE_AA
             )
             y_offset += 18
+    
+    def draw_scan_zones(self, image, scan_zones, color=(255, 255, 0)):
+        """
+        Outline the scan zones that are sent to the detector
         
+        Args:
+            image: Input image
+            scan_zones: List of ScanZone
+            color: Outline color (BGR)
+            
+        Returns:
+            Image with zone outlines
+        """
+        polygons = [zone.polygon.round().astype(np.int32) for zone in scan_zones]
+        cv2.polylines(image, polygons, True, color, 1, cv2.LINE_AA)
         return image
     
     def draw_status_bar(self, image, text, color=(0, 255, 0)):
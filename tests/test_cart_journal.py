@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.cart_journal import CartJournal, recover_cart
+from src.cart_manager import CartManager
+from src.event_sink import EventSink, RingOutput
+
+
+def _new_cart(path, compact_every):
+    return CartManager(dedup_cooldown=0.0, event_sink=EventSink([RingOutput()]),
+                       journal=CartJournal(str(path), compact_every=compact_every))
+
+
+def test_recovery_after_compaction_keeps_history(tmp_path):
+    path = tmp_path / 'cart.journal'
+    cart = _new_cart(path, compact_every=3)
+    items = [('apple', 1.20), ('banana', 0.50), ('apple', 1.20), ('orange', 0.80), ('milk', 2.10)]
+    for step, (name, price) in enumerate(items):
+        cart.add_items([{'name': name, 'confidence': 0.9, 'bbox': [0, 0, 10, 10], 'price': price}],
+                       timestamp=1000.0 + step)
+    cart.journal.close()
+    # At least one compaction happened, and records followed it
+    assert (tmp_path / 'cart.journal.snapshot').exists()
+
+    recovered = recover_cart(str(path), dedup_cooldown=0.0, compact_every=3)
+    recovered.journal.close()
+
+    assert recovered.get_total() == cart.get_total()
+    assert recovered.get_item_count() == cart.get_item_count()
+    assert recovered.cart_history == cart.cart_history
+    assert [event['item'] for event in recovered.cart_history] == [name for name, _ in items]
+
+
+def test_recovery_without_compaction(tmp_path):
+    path = tmp_path / 'cart.journal'
+    cart = _new_cart(path, compact_every=100)
+    cart.add_items([{'name': 'apple', 'confidence': 0.9, 'bbox': None, 'price': 1.20}], timestamp=1000.0)
+    cart.journal.close()
+
+    recovered = recover_cart(str(path), dedup_cooldown=0.0)
+    recovered.journal.close()
+
+    assert not (tmp_path / 'cart.journal.snapshot').exists()
+    assert recovered.cart_history == cart.cart_history
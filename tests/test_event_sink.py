@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.event_sink import EventSink, RingOutput
+
+
+def test_bad_template_does_not_stop_writer():
+    ring = RingOutput()
+    sink = EventSink([ring], policy='block')
+    sink.emit('a', 'bad {missing}', x=1)
+    sink.emit('b', 'good {x}', x=2)
+    sink.flush()
+
+    assert sink._thread.is_alive()
+    assert [record['event'] for record in ring.records] == ['a', 'b']
+    assert 'bad {missing}' in ring.records[0]['message']
+    assert ring.records[1]['message'] == 'good 2'
+    sink.close()